@@ -0,0 +1,30 @@
+# Ahead-of-time build of the scalar pricing kernels into fi_kernels, an extension module
+# next to this file. FinancialCalculator imports it when present and falls back to the
+# JIT kernels otherwise; the parallel batch kernels always stay JIT compiled.
+# Run at build time: python backend/build_kernels.py
+from pathlib import Path
+from numba.pycc import CC
+from financial_calculator_kernels import ytm_kernel, duration_kernel, convexity_kernel, metrics_kernel
+
+cc = CC("fi_kernels")
+cc.output_dir = str(Path(__file__).parent)
+
+@cc.export("ytm_kernel", "f8(f8, f8, f8, f8, f8, f8, i8)")
+def _ytm(face, coupon_rate, freq, years, price, tolerance, max_iterations):
+    return ytm_kernel(face, coupon_rate, freq, years, price, tolerance, max_iterations)
+
+@cc.export("duration_kernel", "UniTuple(f8, 2)(f8, f8, f8, f8, f8)")
+def _duration(face, coupon_rate, freq, years, ytm):
+    return duration_kernel(face, coupon_rate, freq, years, ytm)
+
+@cc.export("convexity_kernel", "f8(f8, f8, f8, f8, f8)")
+def _convexity(face, coupon_rate, freq, years, ytm):
+    return convexity_kernel(face, coupon_rate, freq, years, ytm)
+
+@cc.export("metrics_kernel", "UniTuple(f8, 4)(f8, f8, f8, f8, f8, f8, i8)")
+def _metrics(face, coupon_rate, freq, years, price, tolerance, max_iterations):
+    return metrics_kernel(face, coupon_rate, freq, years, price, tolerance, max_iterations)
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"✅ Built fi_kernels in {cc.output_dir}")
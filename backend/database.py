@@ -15,13 +15,26 @@ MYSQL_USER = os.getenv('MYSQL_USER', 'root')
 MYSQL_PASSWORD = os.getenv('MYSQL_PASSWORD', 'root')
 MYSQL_DATABASE = os.getenv('MYSQL_DATABASE', 'fixed_income_db')
 ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
+DISABLE_DB_POOL = os.getenv('DISABLE_DB_POOL', 'false').lower() == 'true'
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '20'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '40'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+SSL_CA_PATH = os.getenv('SSL_CA_PATH', '/etc/secrets/ca.pem')
 
-# Create SSL context for Aiven
+# TLS to the server is on by default (Aiven); DB_SSL=false connects in plain text, e.g. to a local MySQL
+DB_SSL = os.getenv(
+    'DB_SSL', 'true' if ENVIRONMENT in ('production', 'development') else 'false'
+).lower() == 'true'
+
+# Create SSL context for Aiven, verifying the server against its CA certificate
 ssl_context = None
-if ENVIRONMENT == 'production' or ENVIRONMENT == 'development':
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
+if DB_SSL:
+    if not os.path.exists(SSL_CA_PATH):
+        raise RuntimeError(
+            f"MySQL CA certificate not found at {SSL_CA_PATH}: set SSL_CA_PATH (start.sh writes it "
+            "from CA_PEM), or DB_SSL=false for a server without TLS"
+        )
+    ssl_context = ssl.create_default_context(cafile=SSL_CA_PATH)
 
 # Connection arguments
 connect_args = {}
@@ -34,13 +47,19 @@ DATABASE_URL = f"mysql+aiomysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MY
 # Sync database URL for initial setup
 SYNC_DATABASE_URL = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}?charset=utf8mb4"
 
+# Keep connections pooled so requests don't pay for a new SSL handshake each time;
+# serverless deploys that can't hold connections open can set DISABLE_DB_POOL=true
+pool_args = {'poolclass': NullPool}
+if not DISABLE_DB_POOL:
+    pool_args = {'pool_size': DB_POOL_SIZE, 'max_overflow': DB_MAX_OVERFLOW, 'pool_recycle': DB_POOL_RECYCLE}
+
 # Create async engine with SSL
 async_engine = create_async_engine(
     DATABASE_URL,
     echo=False,
     pool_pre_ping=True,
-    poolclass=NullPool,
-    connect_args=connect_args
+    connect_args=connect_args,
+    **pool_args
 )
 
 # Create async session factory
@@ -58,9 +77,15 @@ async def get_db():
         finally:
             await session.close()
 
+# Set once tables have been created so repeated startups skip the round-trip
+_initialized = False
+
 # Function to initialize database
 def init_db():
     """Create all tables using sync engine"""
+    global _initialized
+    if _initialized:
+        return
     try:
         # Create sync engine with SSL
         sync_engine = create_engine(
@@ -72,12 +97,7 @@ def init_db():
         # Create tables
         Base.metadata.create_all(bind=sync_engine)
         sync_engine.dispose()
+        _initialized = True
         print(f"✅ Database initialized: {MYSQL_DATABASE}")
     except Exception as e:
         print(f"⚠️ Database initialization warning: {e}")
-
-# Initialize database on startup
-try:
-    init_db()
-except Exception as e:
-    print(f"⚠️ Could not initialize database: {e}")
@@ -1,8 +1,59 @@
+from bisect import bisect_left
 from decimal import Decimal
 from datetime import date, timedelta
+from functools import lru_cache
 from typing import Optional, List, Tuple
 import numpy as np
 from models import CouponFrequency, DayCountConvention
+from financial_calculator_kernels import ytm_batch, duration_batch, convexity_batch
+
+try:
+    # Scalar kernels compiled ahead of time by build_kernels.py: no JIT pause on first use
+    from fi_kernels import ytm_kernel, duration_kernel, convexity_kernel, metrics_kernel
+except ImportError:
+    from financial_calculator_kernels import ytm_kernel, duration_kernel, convexity_kernel, metrics_kernel
+
+# Number of coupon payments per year
+_FREQ_MULT = {
+    CouponFrequency.MONTHLY: 12,
+    CouponFrequency.QUARTERLY: 4,
+    CouponFrequency.SEMI_ANNUAL: 2,
+    CouponFrequency.ANNUAL: 1,
+    CouponFrequency.ZERO_COUPON: 0
+}
+
+# Day-count year basis; ACT/ACT is simplified to 365 as in calculate_days_between
+_DAY_COUNT_BASIS = {
+    DayCountConvention.ACT_360: 360,
+    DayCountConvention.ACT_365: 365,
+    DayCountConvention.ACT_ACT: 365,
+    DayCountConvention.THIRTY_360: 360
+}
+
+@lru_cache(maxsize=8192)
+def _coupon_dates_cached(issue_ord: int, maturity_ord: int, frequency: CouponFrequency) -> Tuple[date, ...]:
+    """Full coupon schedule after issue up to maturity, keyed on date ordinals"""
+    issue_date = date.fromordinal(issue_ord)
+    maturity_date = date.fromordinal(maturity_ord)
+    months_between = 12 // _FREQ_MULT[frequency]
+    
+    # Step back from maturity in whole months, clamping the day to each month's length
+    maturity_month = np.datetime64(maturity_date, "M")
+    count = int((maturity_month - np.datetime64(issue_date, "M")).astype(int)) // months_between + 1
+    months = maturity_month - months_between * np.arange(max(count, 0))[::-1]
+    month_starts = months.astype("datetime64[D]")
+    month_lengths = ((months + 1).astype("datetime64[D]") - month_starts).astype(int)
+    coupon_dates = month_starts + (np.minimum(maturity_date.day, month_lengths) - 1)
+    
+    return tuple(coupon_dates[coupon_dates > np.datetime64(issue_date, "D")].tolist())
+
+def _year_month_day(dates: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Split datetime64[D] values into integer year, month and day arrays"""
+    months = dates.astype("datetime64[M]")
+    years = months.astype("datetime64[Y]").astype(np.int64) + 1970
+    month_numbers = months.astype(np.int64) % 12 + 1
+    days = (dates - months.astype("datetime64[D]")).astype(np.int64) + 1
+    return years, month_numbers, days
 
 class FinancialCalculator:
     """Financial calculations for fixed income securities"""
@@ -10,14 +61,7 @@ class FinancialCalculator:
     @staticmethod
     def get_frequency_multiplier(frequency: CouponFrequency) -> int:
         """Get number of payments per year based on frequency"""
-        mapping = {
-            CouponFrequency.MONTHLY: 12,
-            CouponFrequency.QUARTERLY: 4,
-            CouponFrequency.SEMI_ANNUAL: 2,
-            CouponFrequency.ANNUAL: 1,
-            CouponFrequency.ZERO_COUPON: 0
-        }
-        return mapping[frequency]
+        return _FREQ_MULT[frequency]
     
     @staticmethod
     def calculate_days_between(start_date: date, end_date: date, convention: DayCountConvention) -> Tuple[int, int]:
@@ -43,11 +87,40 @@ class FinancialCalculator:
         return 0, 365
     
     @staticmethod
-    def calculate_current_yield(annual_coupon: Decimal, current_price: Decimal) -> Decimal:
+    def calculate_days_between_batch(
+        start_dates: np.ndarray,
+        end_dates: np.ndarray,
+        conventions
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorised calculate_days_between over arrays of dates
+        conventions may be a single DayCountConvention or one per date pair
+        Returns: (numerator_days, denominator_days) as int arrays
+        """
+        start = np.asarray(start_dates, dtype="datetime64[D]")
+        end = np.asarray(end_dates, dtype="datetime64[D]")
+        if isinstance(conventions, DayCountConvention):
+            conventions = [conventions]
+        basis = np.array([_DAY_COUNT_BASIS[c] for c in conventions], dtype=np.int64)
+        is_thirty_360 = np.array([c == DayCountConvention.THIRTY_360 for c in conventions])
+        
+        actual_days = (end - start).astype(np.int64)
+        
+        # 30/360 without branching: d2 is only capped when d1 hits 30
+        y1, m1, d1 = _year_month_day(start)
+        y2, m2, d2 = _year_month_day(end)
+        d1 = np.minimum(d1, 30)
+        d2 = np.where(d1 == 30, np.minimum(d2, 30), d2)
+        thirty_days = (y2 - y1) * 360 + (m2 - m1) * 30 + (d2 - d1)
+        
+        days = np.where(is_thirty_360, thirty_days, actual_days)
+        return days, np.broadcast_to(basis, days.shape)
+    
+    @staticmethod
+    def calculate_current_yield(annual_coupon: float, current_price: float) -> float:
         """Calculate current yield: (annual coupon / current price) * 100"""
         if current_price <= 0:
-            return Decimal("0.0")
-        return (annual_coupon / current_price) * Decimal("100")
+            return 0.0
+        return (annual_coupon / current_price) * 100
     
     @staticmethod
     def calculate_ytm(
@@ -59,56 +132,71 @@ class FinancialCalculator:
         max_iterations: int = 100,
         tolerance: float = 0.0001
     ) -> Optional[Decimal]:
-        """Calculate Yield to Maturity using Newton-Raphson method"""
+        """Calculate Yield to Maturity using bracketed Newton-Raphson"""
         
-        freq_multiplier = FinancialCalculator.get_frequency_multiplier(frequency)
+        freq_multiplier = _FREQ_MULT[frequency]
+        ytm = ytm_kernel(
+            float(face_value),
+            float(coupon_rate),
+            float(freq_multiplier),
+            float(years_to_maturity),
+            float(current_price),
+            tolerance,
+            max_iterations
+        )
+        if np.isnan(ytm):
+            return None
         if freq_multiplier == 0:  # Zero coupon bond
-            # YTM = (Face Value / Price)^(1/years) - 1
-            if current_price <= 0 or years_to_maturity <= 0:
-                return None
-            ytm = (float(face_value) / float(current_price)) ** (1 / float(years_to_maturity)) - 1
-            return Decimal(str(ytm * 100))
-        
-        # Coupon payment per period
-        coupon_payment = float(face_value) * (float(coupon_rate) / 100) / freq_multiplier
-        periods = float(years_to_maturity) * freq_multiplier
-        price = float(current_price)
-        face = float(face_value)
-        
-        # Initial guess: approximate yield
-        ytm_guess = (coupon_payment + (face - price) / periods) / ((face + price) / 2)
-        
-        for _ in range(max_iterations):
-            # Calculate present value and derivative
-            pv = 0
-            pv_derivative = 0
-            
-            for t in range(1, int(periods) + 1):
-                discount_factor = (1 + ytm_guess) ** t
-                pv += coupon_payment / discount_factor
-                pv_derivative += -t * coupon_payment / ((1 + ytm_guess) ** (t + 1))
-            
-            # Add face value at maturity
-            discount_factor = (1 + ytm_guess) ** periods
-            pv += face / discount_factor
-            pv_derivative += -periods * face / ((1 + ytm_guess) ** (periods + 1))
-            
-            # Newton-Raphson update
-            price_diff = pv - price
-            if abs(price_diff) < tolerance:
-                # Convert periodic yield to annual percentage
-                annual_ytm = ytm_guess * freq_multiplier * 100
-                return Decimal(str(round(annual_ytm, 4)))
-            
-            if pv_derivative == 0:
-                return None
-            
-            ytm_guess = ytm_guess - price_diff / pv_derivative
-            
-            if ytm_guess < -0.99:  # Prevent negative yield issues
-                ytm_guess = 0.01
-        
-        return None  # Failed to converge
+            return Decimal(str(ytm))
+        return Decimal(str(round(ytm, 4)))
+    
+    @staticmethod
+    def calculate_ytm_batch(
+        face_values: np.ndarray,
+        coupon_rates: np.ndarray,
+        frequencies: np.ndarray,
+        years_to_maturity: np.ndarray,
+        current_prices: np.ndarray,
+        max_iterations: int = 100,
+        tolerance: float = 0.0001
+    ) -> np.ndarray:
+        """Calculate Yield to Maturity for many bonds at once
+        frequencies are payments per year; returns annual percentages, NaN where YTM cannot be solved
+        """
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        ytm = ytm_batch(
+            np.asarray(face_values, dtype=np.float64),
+            np.asarray(coupon_rates, dtype=np.float64),
+            frequencies,
+            np.asarray(years_to_maturity, dtype=np.float64),
+            np.asarray(current_prices, dtype=np.float64),
+            tolerance,
+            max_iterations
+        )
+        return np.where(frequencies > 0, np.round(ytm, 4), ytm)
+    
+    @staticmethod
+    def warm_up() -> None:
+        """Compile (or load from cache) the numeric kernels ahead of the first request"""
+        FinancialCalculator.calculate_ytm(
+            Decimal("1000"), Decimal("5"), CouponFrequency.SEMI_ANNUAL, Decimal("10"), Decimal("950")
+        )
+        FinancialCalculator.calculate_ytm_batch(
+            np.array([1000.0]), np.array([5.0]), np.array([2.0]), np.array([10.0]), np.array([950.0])
+        )
+        FinancialCalculator.calculate_duration_batch(
+            np.array([1000.0]), np.array([5.0]), np.array([2.0]), np.array([10.0]), np.array([5.6617])
+        )
+        FinancialCalculator.calculate_convexity_batch(
+            np.array([1000.0]), np.array([5.0]), np.array([2.0]), np.array([10.0]), np.array([5.6617])
+        )
+        FinancialCalculator.calculate_duration(
+            Decimal("1000"), Decimal("5"), CouponFrequency.SEMI_ANNUAL, Decimal("10"), Decimal("5.6617")
+        )
+        FinancialCalculator.calculate_convexity(
+            Decimal("1000"), Decimal("5"), CouponFrequency.SEMI_ANNUAL, Decimal("10"), Decimal("5.6617")
+        )
+        FinancialCalculator.calculate_all_metrics(1000.0, 5.0, 2, 10.0, 950.0)
     
     @staticmethod
     def calculate_duration(
@@ -121,38 +209,16 @@ class FinancialCalculator:
         """Calculate Macaulay Duration and Modified Duration
         Returns: (macaulay_duration, modified_duration)
         """
-        
-        freq_multiplier = FinancialCalculator.get_frequency_multiplier(frequency)
-        if freq_multiplier == 0:  # Zero coupon bond
-            macaulay = years_to_maturity
-            modified = macaulay / (1 + float(ytm) / 100)
-            return Decimal(str(macaulay)), Decimal(str(modified))
-        
-        coupon_payment = float(face_value) * (float(coupon_rate) / 100) / freq_multiplier
-        periods = float(years_to_maturity) * freq_multiplier
-        periodic_ytm = float(ytm) / 100 / freq_multiplier
-        
-        weighted_pv = 0
-        total_pv = 0
-        
-        for t in range(1, int(periods) + 1):
-            discount_factor = (1 + periodic_ytm) ** t
-            pv = coupon_payment / discount_factor
-            weighted_pv += (t / freq_multiplier) * pv
-            total_pv += pv
-        
-        # Add face value at maturity
-        discount_factor = (1 + periodic_ytm) ** periods
-        face_pv = float(face_value) / discount_factor
-        weighted_pv += (periods / freq_multiplier) * face_pv
-        total_pv += face_pv
-        
-        if total_pv == 0:
+        macaulay_duration, modified_duration = duration_kernel(
+            float(face_value),
+            float(coupon_rate),
+            float(_FREQ_MULT[frequency]),
+            float(years_to_maturity),
+            float(ytm)
+        )
+        if np.isnan(macaulay_duration):
             return None, None
         
-        macaulay_duration = weighted_pv / total_pv
-        modified_duration = macaulay_duration / (1 + periodic_ytm)
-        
         return Decimal(str(round(macaulay_duration, 4))), Decimal(str(round(modified_duration, 4)))
     
     @staticmethod
@@ -164,77 +230,121 @@ class FinancialCalculator:
         ytm: Decimal
     ) -> Optional[Decimal]:
         """Calculate convexity of a bond"""
-        
-        freq_multiplier = FinancialCalculator.get_frequency_multiplier(frequency)
-        if freq_multiplier == 0:  # Zero coupon bond
-            periodic_ytm = float(ytm) / 100
-            periods = float(years_to_maturity)
-            convexity = periods * (periods + 1) / ((1 + periodic_ytm) ** 2)
-            return Decimal(str(round(convexity, 4)))
-        
-        coupon_payment = float(face_value) * (float(coupon_rate) / 100) / freq_multiplier
-        periods = float(years_to_maturity) * freq_multiplier
-        periodic_ytm = float(ytm) / 100 / freq_multiplier
-        
-        weighted_pv = 0
-        total_pv = 0
-        
-        for t in range(1, int(periods) + 1):
-            discount_factor = (1 + periodic_ytm) ** t
-            pv = coupon_payment / discount_factor
-            weighted_pv += t * (t + 1) * pv
-            total_pv += pv
-        
-        # Add face value at maturity
-        discount_factor = (1 + periodic_ytm) ** periods
-        face_pv = float(face_value) / discount_factor
-        weighted_pv += periods * (periods + 1) * face_pv
-        total_pv += face_pv
-        
-        if total_pv == 0:
+        convexity = convexity_kernel(
+            float(face_value),
+            float(coupon_rate),
+            float(_FREQ_MULT[frequency]),
+            float(years_to_maturity),
+            float(ytm)
+        )
+        if np.isnan(convexity):
             return None
         
-        convexity = weighted_pv / (total_pv * (freq_multiplier ** 2) * ((1 + periodic_ytm) ** 2))
         return Decimal(str(round(convexity, 4)))
     
+    @staticmethod
+    def calculate_all_metrics(
+        face_value: float,
+        coupon_rate: float,
+        freq_multiplier: int,
+        years_to_maturity: float,
+        current_price: float,
+        max_iterations: int = 100,
+        tolerance: float = 0.0001
+    ) -> Tuple[Optional[Decimal], Optional[Decimal], Optional[Decimal], Optional[Decimal]]:
+        """YTM, duration and convexity in one kernel call, rounded like the individual methods
+        freq_multiplier is payments per year as from get_frequency_multiplier (the stored
+        payments_per_year column), 0 for zero-coupon bonds
+        Returns: (ytm, macaulay_duration, modified_duration, convexity)
+        """
+        ytm, macaulay_duration, modified_duration, convexity = metrics_kernel(
+            float(face_value),
+            float(coupon_rate),
+            float(freq_multiplier),
+            float(years_to_maturity),
+            float(current_price),
+            tolerance,
+            max_iterations
+        )
+        if np.isnan(ytm):
+            return None, None, None, None
+        
+        ytm = Decimal(str(ytm)) if freq_multiplier == 0 else Decimal(str(round(ytm, 4)))
+        if np.isnan(macaulay_duration):
+            return ytm, None, None, None
+        return (
+            ytm,
+            Decimal(str(round(macaulay_duration, 4))),
+            Decimal(str(round(modified_duration, 4))),
+            Decimal(str(round(convexity, 4)))
+        )
+    
+    @staticmethod
+    def calculate_duration_batch(
+        face_values: np.ndarray,
+        coupon_rates: np.ndarray,
+        frequencies: np.ndarray,
+        years_to_maturity: np.ndarray,
+        ytms: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Calculate Macaulay and Modified Duration for many bonds at once
+        Returns: (macaulay_durations, modified_durations), NaN where undefined
+        """
+        macaulay, modified = duration_batch(
+            np.asarray(face_values, dtype=np.float64),
+            np.asarray(coupon_rates, dtype=np.float64),
+            np.asarray(frequencies, dtype=np.float64),
+            np.asarray(years_to_maturity, dtype=np.float64),
+            np.asarray(ytms, dtype=np.float64)
+        )
+        return np.round(macaulay, 4), np.round(modified, 4)
+    
+    @staticmethod
+    def calculate_convexity_batch(
+        face_values: np.ndarray,
+        coupon_rates: np.ndarray,
+        frequencies: np.ndarray,
+        years_to_maturity: np.ndarray,
+        ytms: np.ndarray
+    ) -> np.ndarray:
+        """Calculate convexity for many bonds at once, NaN where undefined"""
+        convexities = convexity_batch(
+            np.asarray(face_values, dtype=np.float64),
+            np.asarray(coupon_rates, dtype=np.float64),
+            np.asarray(frequencies, dtype=np.float64),
+            np.asarray(years_to_maturity, dtype=np.float64),
+            np.asarray(ytms, dtype=np.float64)
+        )
+        return np.round(convexities, 4)
+    
     @staticmethod
     def generate_coupon_dates(
         issue_date: date,
         maturity_date: date,
         frequency: CouponFrequency,
         start_from: Optional[date] = None
-    ) -> List[date]:
-        """Generate coupon payment dates"""
+    ) -> Tuple[date, ...]:
+        """Generate coupon payment dates
+        Returns the memoized schedule (or a slice of it) as an immutable tuple
+        """
         
-        freq_multiplier = FinancialCalculator.get_frequency_multiplier(frequency)
+        freq_multiplier = _FREQ_MULT[frequency]
         if freq_multiplier == 0:  # Zero coupon
-            return [maturity_date]
+            return (maturity_date,)
         
-        months_between = 12 // freq_multiplier
-        coupon_dates = []
-        
-        current_date = maturity_date
-        while current_date > issue_date:
-            if start_from is None or current_date >= start_from:
-                coupon_dates.append(current_date)
-            
-            # Move back by payment frequency
-            year = current_date.year
-            month = current_date.month - months_between
-            day = current_date.day
-            
-            while month < 1:
-                month += 12
-                year -= 1
-            
-            try:
-                current_date = date(year, month, day)
-            except ValueError:
-                # Handle end-of-month edge cases
-                current_date = date(year, month, 28)
-        
-        coupon_dates.reverse()
-        return coupon_dates
+        coupon_dates = _coupon_dates_cached(issue_date.toordinal(), maturity_date.toordinal(), frequency)
+        if start_from is None:
+            return coupon_dates
+        # Cached dates are sorted, so locate the first date >= start_from directly
+        return coupon_dates[bisect_left(coupon_dates, start_from):]
+    
+    @staticmethod
+    def calculate_coupon_period_days(start_date: date, coupon_dates: Tuple[date, ...]) -> np.ndarray:
+        """Actual days from each coupon date's predecessor, the first one counted from start_date"""
+        return np.diff(
+            np.array(coupon_dates, dtype="datetime64[D]"),
+            prepend=np.datetime64(start_date, "D")
+        ).astype(np.int64)
     
     @staticmethod
     def calculate_accrued_interest(
@@ -247,7 +357,7 @@ class FinancialCalculator:
     ) -> Decimal:
         """Calculate accrued interest from last coupon date to settlement"""
         
-        freq_multiplier = FinancialCalculator.get_frequency_multiplier(frequency)
+        freq_multiplier = _FREQ_MULT[frequency]
         if freq_multiplier == 0:
             return Decimal("0.0")
         
@@ -265,3 +375,31 @@ class FinancialCalculator:
         
         accrued = coupon_payment * (days_accrued / period_length)
         return Decimal(str(round(accrued, 4)))
+    
+    @staticmethod
+    def calculate_accrued_interest_batch(
+        face_values: np.ndarray,
+        coupon_rates: np.ndarray,
+        frequencies: List[CouponFrequency],
+        last_coupon_dates: np.ndarray,
+        settlement_dates: np.ndarray,
+        conventions: List[DayCountConvention]
+    ) -> np.ndarray:
+        """Calculate accrued interest for many holdings at once
+        settlement_dates may be a single date; zero-coupon bonds accrue 0
+        """
+        freq = np.array([_FREQ_MULT[f] for f in frequencies], dtype=np.float64)
+        days_accrued, days_in_period = FinancialCalculator.calculate_days_between_batch(
+            last_coupon_dates, settlement_dates, conventions
+        )
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            coupon_payment = np.asarray(face_values, dtype=np.float64) * (np.asarray(coupon_rates, dtype=np.float64) / 100) / freq
+            period_length = days_in_period / freq
+            accrued = coupon_payment * (days_accrued / period_length)
+        # Python's round, as in calculate_accrued_interest: np.round scales by 10**4 first,
+        # which can move a value that sits just below a half to the other side of it
+        rounded = np.fromiter(
+            (round(value, 4) for value in accrued.ravel().tolist()), dtype=np.float64, count=accrued.size
+        ).reshape(accrued.shape)
+        return np.where(freq > 0, rounded, 0.0)
@@ -0,0 +1,274 @@
+# Numba-compiled pricing kernels behind FinancialCalculator; they work on float64
+# inputs only, the Decimal API stays in financial_calculator
+from typing import Tuple
+import numpy as np
+from numba import njit, prange
+
+@njit(cache=True)
+def discount_factors(periodic_yield: float, periods: float) -> Tuple[float, float]:
+    """Discount factors for the last whole coupon period and for the face value
+    Returns: ((1 + y)^-int(periods), (1 + y)^-periods), sharing one power for whole periods
+    """
+    one_plus = 1.0 + periodic_yield
+    n = int(periods)
+    v_n = one_plus ** -n
+    if periods == n:
+        return v_n, v_n
+    return v_n, v_n * one_plus ** (n - periods)
+
+@njit(cache=True)
+def annuity_sums(periodic_yield: float, n: int, v_n: float) -> Tuple[float, float, float]:
+    """Closed-form coupon sums over t = 1..n with v = 1 / (1 + y), given v_n = v^n
+    Returns: (sum v^t, sum t*v^t, sum t*(t+1)*v^t)
+    """
+    y = periodic_yield
+    if abs(y) * max(n, 1) < 2e-3:
+        # Second-order Taylor expansion around y = 0 avoids cancellation in the
+        # divisions below; a_k are the power sums of t^k over t = 1..n
+        a1 = n * (n + 1) / 2
+        a2 = n * (n + 1) * (2 * n + 1) / 6
+        a3 = a1 * a1
+        a4 = n * (n + 1) * (2 * n + 1) * (3 * n * n + 3 * n - 1) / 30
+        s0 = n - y * a1 + y * y * (a2 + a1) / 2
+        s1 = a1 - y * a2 + y * y * (a3 + a2) / 2
+        s2 = (a2 + a1) - y * (a3 + a2) + y * y * (a4 + 2 * a3 + a2) / 2
+        return s0, s1, s2
+    
+    one_plus = 1 + y
+    y = one_plus - 1  # keep y consistent with the rounded base
+    s0 = (1 - v_n) / y
+    s1 = (one_plus * s0 - n * v_n) / y
+    s2 = (2 * one_plus * s1 - n * (n + 1) * v_n) / y
+    return s0, s1, s2
+
+@njit(cache=True)
+def price_and_derivative(periodic_yield: float, coupon_payment: float, face: float, periods: float) -> Tuple[float, float]:
+    """Bond price and its derivative with respect to the periodic yield"""
+    v_n, face_discount = discount_factors(periodic_yield, periods)
+    annuity, weighted_annuity, _ = annuity_sums(periodic_yield, int(periods), v_n)
+    one_plus = 1.0 + periodic_yield
+    face_pv = face * face_discount
+    pv = coupon_payment * annuity + face_pv
+    pv_derivative = -(coupon_payment * weighted_annuity + periods * face_pv) / one_plus
+    return pv, pv_derivative
+
+@njit(cache=True)
+def ytm_kernel(
+    face: float,
+    coupon_rate: float,
+    freq: float,
+    years: float,
+    price: float,
+    tolerance: float,
+    max_iterations: int
+) -> float:
+    """Annual YTM in percent for a single bond, or NaN if it cannot be solved"""
+    if price <= 0 or years <= 0:
+        return np.nan
+    
+    if freq == 0:  # Zero coupon bond
+        # YTM = (Face Value / Price)^(1/years) - 1
+        return ((face / price) ** (1 / years) - 1) * 100
+    
+    # Coupon payment per period
+    coupon_payment = face * (coupon_rate / 100) / freq
+    periods = years * freq
+    
+    # Initial guess: approximate yield
+    ytm_guess = (coupon_payment + (face - price) / periods) / ((face + price) / 2)
+    
+    # Price is monotonically decreasing in yield, so bracket the periodic yield
+    # (-50% to 100% annualised) and run Newton-Raphson safeguarded by bisection
+    lo = -0.5 / freq
+    hi = 1.0 / freq
+    if price_and_derivative(lo, coupon_payment, face, periods)[0] >= price >= price_and_derivative(hi, coupon_payment, face, periods)[0]:
+        y = ytm_guess if lo < ytm_guess < hi else 0.5 * (lo + hi)
+        for _ in range(max_iterations):
+            pv, pv_derivative = price_and_derivative(y, coupon_payment, face, periods)
+            if pv > price:
+                lo = y
+            else:
+                hi = y
+            
+            y_next = y - (pv - price) / pv_derivative if pv_derivative != 0 else hi
+            if not lo < y_next < hi:
+                y_next = 0.5 * (lo + hi)
+            
+            if abs(y_next - y) < 1e-12:
+                return y_next * freq * 100
+            y = y_next
+    
+    # Yield outside the bracket - plain Newton-Raphson from the initial guess
+    for _ in range(max_iterations):
+        pv, pv_derivative = price_and_derivative(ytm_guess, coupon_payment, face, periods)
+        
+        price_diff = pv - price
+        if abs(price_diff) < tolerance:
+            # Convert periodic yield to annual percentage
+            return ytm_guess * freq * 100
+        
+        if pv_derivative == 0:
+            return np.nan
+        
+        ytm_guess = ytm_guess - price_diff / pv_derivative
+        
+        if ytm_guess < -0.99:  # Prevent negative yield issues
+            ytm_guess = 0.01
+    
+    return np.nan  # Failed to converge
+
+@njit(cache=True, parallel=True)
+def ytm_batch(
+    face: np.ndarray,
+    coupon_rate: np.ndarray,
+    freq: np.ndarray,
+    years: np.ndarray,
+    price: np.ndarray,
+    tolerance: float,
+    max_iterations: int
+) -> np.ndarray:
+    """Run ytm_kernel over arrays of bonds in parallel"""
+    out = np.empty(face.shape[0])
+    for i in prange(face.shape[0]):
+        out[i] = ytm_kernel(face[i], coupon_rate[i], freq[i], years[i], price[i], tolerance, max_iterations)
+    return out
+
+@njit(cache=True)
+def duration_kernel(face: float, coupon_rate: float, freq: float, years: float, ytm: float) -> Tuple[float, float]:
+    """Macaulay and modified duration in years for an annual YTM in percent, NaN if undefined"""
+    annual_ytm = ytm / 100
+    if freq == 0:  # Zero coupon bond
+        return years, years / (1 + annual_ytm)
+    
+    coupon_payment = face * (coupon_rate / 100) / freq
+    periods = years * freq
+    periodic_ytm = annual_ytm / freq
+    
+    v_n, face_discount = discount_factors(periodic_ytm, periods)
+    annuity, weighted_annuity, _ = annuity_sums(periodic_ytm, int(periods), v_n)
+    weighted_pv = coupon_payment * weighted_annuity / freq
+    total_pv = coupon_payment * annuity
+    
+    # Add face value at maturity
+    face_pv = face * face_discount
+    weighted_pv += (periods / freq) * face_pv
+    total_pv += face_pv
+    
+    if total_pv == 0:
+        return np.nan, np.nan
+    
+    macaulay_duration = weighted_pv / total_pv
+    return macaulay_duration, macaulay_duration / (1 + periodic_ytm)
+
+@njit(cache=True)
+def convexity_kernel(face: float, coupon_rate: float, freq: float, years: float, ytm: float) -> float:
+    """Convexity for an annual YTM in percent, NaN if undefined"""
+    annual_ytm = ytm / 100
+    if freq == 0:  # Zero coupon bond
+        one_plus = 1 + annual_ytm
+        return years * (years + 1) / (one_plus * one_plus)
+    
+    coupon_payment = face * (coupon_rate / 100) / freq
+    periods = years * freq
+    periodic_ytm = annual_ytm / freq
+    
+    v_n, face_discount = discount_factors(periodic_ytm, periods)
+    annuity, _, convexity_annuity = annuity_sums(periodic_ytm, int(periods), v_n)
+    weighted_pv = coupon_payment * convexity_annuity
+    total_pv = coupon_payment * annuity
+    
+    # Add face value at maturity
+    face_pv = face * face_discount
+    weighted_pv += periods * (periods + 1) * face_pv
+    total_pv += face_pv
+    
+    if total_pv == 0:
+        return np.nan
+    
+    one_plus = 1 + periodic_ytm
+    return weighted_pv / (total_pv * (freq * freq) * (one_plus * one_plus))
+
+@njit(cache=True)
+def duration_convexity_kernel(
+    face: float,
+    coupon_rate: float,
+    freq: float,
+    years: float,
+    ytm: float
+) -> Tuple[float, float, float]:
+    """Macaulay duration, modified duration and convexity from one set of discounted sums
+    Same results as duration_kernel and convexity_kernel, NaN where undefined
+    """
+    annual_ytm = ytm / 100
+    if freq == 0:  # Zero coupon bond
+        one_plus = 1 + annual_ytm
+        return years, years / one_plus, years * (years + 1) / (one_plus * one_plus)
+    
+    coupon_payment = face * (coupon_rate / 100) / freq
+    periods = years * freq
+    periodic_ytm = annual_ytm / freq
+    
+    # PV, sum t*PV(CF) and sum t*(t+1)*PV(CF) in a single pass over the cash flows
+    v_n, face_discount = discount_factors(periodic_ytm, periods)
+    annuity, weighted_annuity, convexity_annuity = annuity_sums(periodic_ytm, int(periods), v_n)
+    face_pv = face * face_discount
+    total_pv = coupon_payment * annuity + face_pv
+    if total_pv == 0:
+        return np.nan, np.nan, np.nan
+    
+    one_plus = 1 + periodic_ytm
+    macaulay_duration = (coupon_payment * weighted_annuity / freq + (periods / freq) * face_pv) / total_pv
+    convexity = (coupon_payment * convexity_annuity + periods * (periods + 1) * face_pv) / (
+        total_pv * (freq * freq) * (one_plus * one_plus)
+    )
+    return macaulay_duration, macaulay_duration / one_plus, convexity
+
+@njit(cache=True)
+def metrics_kernel(
+    face: float,
+    coupon_rate: float,
+    freq: float,
+    years: float,
+    price: float,
+    tolerance: float,
+    max_iterations: int
+) -> Tuple[float, float, float, float]:
+    """YTM (annual percent), Macaulay and modified duration and convexity for a single bond
+    Coupon-bond risk measures are taken at the YTM rounded to 4 places, as reported
+    """
+    ytm = ytm_kernel(face, coupon_rate, freq, years, price, tolerance, max_iterations)
+    if np.isnan(ytm):
+        return ytm, np.nan, np.nan, np.nan
+    if freq != 0:
+        ytm = np.round(ytm, 4)
+    macaulay_duration, modified_duration, convexity = duration_convexity_kernel(face, coupon_rate, freq, years, ytm)
+    return ytm, macaulay_duration, modified_duration, convexity
+
+@njit(cache=True, parallel=True)
+def duration_batch(
+    face: np.ndarray,
+    coupon_rate: np.ndarray,
+    freq: np.ndarray,
+    years: np.ndarray,
+    ytm: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Run duration_kernel over arrays of bonds in parallel"""
+    macaulay = np.empty(face.shape[0])
+    modified = np.empty(face.shape[0])
+    for i in prange(face.shape[0]):
+        macaulay[i], modified[i] = duration_kernel(face[i], coupon_rate[i], freq[i], years[i], ytm[i])
+    return macaulay, modified
+
+@njit(cache=True, parallel=True)
+def convexity_batch(
+    face: np.ndarray,
+    coupon_rate: np.ndarray,
+    freq: np.ndarray,
+    years: np.ndarray,
+    ytm: np.ndarray
+) -> np.ndarray:
+    """Run convexity_kernel over arrays of bonds in parallel"""
+    out = np.empty(face.shape[0])
+    for i in prange(face.shape[0]):
+        out[i] = convexity_kernel(face[i], coupon_rate[i], freq[i], years[i], ytm[i])
+    return out
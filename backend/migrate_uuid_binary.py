@@ -0,0 +1,80 @@
+import asyncio
+import sys
+import aiomysql
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Same connection settings as the app, read after .env is loaded
+from database import MYSQL_HOST, MYSQL_PORT, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DATABASE, ssl_context
+
+# Every UUID column, keyed by table; converted from VARCHAR(36) text to BINARY(16)
+UUID_COLUMNS = {
+    'fixed_income_securities': ['id'],
+    'portfolios': ['id'],
+    'portfolio_holdings': ['id', 'portfolio_id', 'security_id'],
+    'coupon_payments': ['id', 'holding_id'],
+    'yield_curves': ['id'],
+}
+
+async def migrate_uuid_columns():
+    try:
+        db_name = MYSQL_DATABASE
+        
+        print(f"📡 Connecting to MySQL at {MYSQL_HOST}:{MYSQL_PORT}...")
+        
+        pool = await aiomysql.create_pool(
+            host=MYSQL_HOST,
+            port=int(MYSQL_PORT),
+            user=MYSQL_USER,
+            password=MYSQL_PASSWORD,
+            # No default database: on a new deploy it doesn't exist yet (setup_db creates it),
+            # and every column below is then simply not found
+            autocommit=True,
+            ssl=ssl_context
+        )
+        
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                # Keys reference each other, so convert all columns before re-enabling checks
+                await cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+                
+                for table, columns in UUID_COLUMNS.items():
+                    for column in columns:
+                        await cursor.execute(
+                            "SELECT DATA_TYPE, IS_NULLABLE FROM information_schema.COLUMNS "
+                            "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+                            (db_name, table, column)
+                        )
+                        row = await cursor.fetchone()
+                        if not row:
+                            print(f"⏭️  {table}.{column} not found, skipping")
+                            continue
+                        
+                        data_type, is_nullable = row
+                        if data_type.lower() not in ('varchar', 'char'):
+                            print(f"✅ {table}.{column} already {data_type}")
+                            continue
+                        
+                        null_clause = "NULL" if is_nullable == 'YES' else "NOT NULL"
+                        
+                        # Go through VARBINARY so the hex text survives the charset change
+                        await cursor.execute(f"ALTER TABLE {db_name}.{table} MODIFY {column} VARBINARY(36) {null_clause}")
+                        await cursor.execute(f"UPDATE {db_name}.{table} SET {column} = UNHEX(REPLACE({column}, '-', ''))")
+                        await cursor.execute(f"ALTER TABLE {db_name}.{table} MODIFY {column} BINARY(16) {null_clause}")
+                        print(f"✅ {table}.{column} converted to BINARY(16)")
+                
+                await cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        
+        pool.close()
+        await pool.wait_closed()
+        
+        print("\n🎉 UUID migration complete!")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(migrate_uuid_columns()) else 1)
@@ -1,10 +1,30 @@
-from sqlalchemy import Column, String, Numeric, Date, DateTime, Enum, Integer, Boolean, Text, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, Numeric, Float, Date, DateTime, Enum, Integer, Boolean, Text, ForeignKey, UniqueConstraint, Index, BINARY
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.sql import func
 from database import Base
 import enum
 import uuid
 
+class UUIDBinary(TypeDecorator):
+    """UUID stored as BINARY(16), exposed to the application as its canonical string"""
+    impl = BINARY(16)
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return uuid.UUID(str(value)).bytes
+        except ValueError:
+            # Malformed ids can never match a stored row
+            return None
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return str(uuid.UUID(bytes=value))
+
 class SecurityType(str, enum.Enum):
     GOVERNMENT_BOND = "GOVERNMENT_BOND"
     CORPORATE_BOND = "CORPORATE_BOND"
@@ -30,10 +50,13 @@ class PaymentStatus(str, enum.Enum):
     PAID = "PAID"
     MISSED = "MISSED"
 
+# Relationships use lazy="raise": an implicit lazy load cannot run on an AsyncSession,
+# so related rows are loaded explicitly (selectinload) or the access fails loudly
+
 class FixedIncomeSecurity(Base):
     __tablename__ = "fixed_income_securities"
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDBinary, primary_key=True, default=lambda: str(uuid.uuid4()))
     security_name = Column(String(255), nullable=False)
     security_type = Column(Enum(SecurityType), nullable=False)
     face_value = Column(Numeric(15, 2), nullable=False)
@@ -46,28 +69,39 @@ class FixedIncomeSecurity(Base):
     issuer = Column(String(255), nullable=False)
     credit_rating = Column(String(10), nullable=True)
     
+    # Derived from face value, coupon rate and frequency when the security is written
+    annual_coupon_amount = Column(Numeric(20, 6), nullable=True)
+    payments_per_year = Column(Integer, nullable=True)
+    
     # Relationships
-    holdings = relationship("PortfolioHolding", back_populates="security")
+    holdings = relationship("PortfolioHolding", back_populates="security", lazy="raise")
+    
+    __table_args__ = (
+        Index('ix_securities_type_issuer', 'security_type', 'issuer'),
+        Index('ft_issuer', 'issuer', mysql_prefix='FULLTEXT'),
+    )
 
 class Portfolio(Base):
     __tablename__ = "portfolios"
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDBinary, primary_key=True, default=lambda: str(uuid.uuid4()))
     portfolio_name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     created_date = Column(DateTime, server_default=func.now())
     last_modified = Column(DateTime, server_default=func.now(), onupdate=func.now())
     total_invested = Column(Numeric(15, 2), default=0.0)
+    # Bumped whenever the portfolio's analytics inputs change; versions ETags and cached analytics
+    analytics_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
-    holdings = relationship("PortfolioHolding", back_populates="portfolio")
+    holdings = relationship("PortfolioHolding", back_populates="portfolio", lazy="raise")
 
 class PortfolioHolding(Base):
     __tablename__ = "portfolio_holdings"
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    portfolio_id = Column(String(36), ForeignKey("portfolios.id"), nullable=False)
-    security_id = Column(String(36), ForeignKey("fixed_income_securities.id"), nullable=False)
+    id = Column(UUIDBinary, primary_key=True, default=lambda: str(uuid.uuid4()))
+    portfolio_id = Column(UUIDBinary, ForeignKey("portfolios.id"), nullable=False)
+    security_id = Column(UUIDBinary, ForeignKey("fixed_income_securities.id"), nullable=False)
     purchase_date = Column(Date, nullable=False)
     purchase_price = Column(Numeric(15, 4), nullable=False)  # As percentage of face value
     quantity = Column(Numeric(15, 4), nullable=False)  # Number of bonds/units
@@ -75,27 +109,46 @@ class PortfolioHolding(Base):
     current_holding = Column(Boolean, default=True)
     
     # Relationships
-    portfolio = relationship("Portfolio", back_populates="holdings")
-    security = relationship("FixedIncomeSecurity", back_populates="holdings")
-    coupon_payments = relationship("CouponPayment", back_populates="holding")
+    portfolio = relationship("Portfolio", back_populates="holdings", lazy="raise")
+    security = relationship("FixedIncomeSecurity", back_populates="holdings", lazy="raise")
+    coupon_payments = relationship("CouponPayment", back_populates="holding", lazy="raise")
+    
+    __table_args__ = (
+        Index('ix_holdings_portfolio_current', 'portfolio_id', 'current_holding'),
+        Index('ix_holdings_security', 'security_id'),
+    )
 
 class CouponPayment(Base):
     __tablename__ = "coupon_payments"
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    holding_id = Column(String(36), ForeignKey("portfolio_holdings.id"), nullable=False)
+    id = Column(UUIDBinary, primary_key=True, default=lambda: str(uuid.uuid4()))
+    holding_id = Column(UUIDBinary, ForeignKey("portfolio_holdings.id"), nullable=False)
     payment_date = Column(Date, nullable=False)
     payment_amount = Column(Numeric(15, 4), nullable=False)
     accrued_days = Column(Integer, default=0)
     status = Column(Enum(PaymentStatus), default=PaymentStatus.PROJECTED)
     
     # Relationships
-    holding = relationship("PortfolioHolding", back_populates="coupon_payments")
+    holding = relationship("PortfolioHolding", back_populates="coupon_payments", lazy="raise")
+    
+    __table_args__ = (Index('ix_coupons_holding', 'holding_id'),)
+
+class PortfolioAnalyticsCache(Base):
+    """Last computed analytics per portfolio, valid while analytics_version matches the portfolio's"""
+    __tablename__ = "portfolio_analytics_cache"
+    
+    portfolio_id = Column(UUIDBinary, ForeignKey("portfolios.id", ondelete="CASCADE"), primary_key=True)
+    weighted_average_yield = Column(Float(53), nullable=True)
+    portfolio_duration = Column(Float(53), nullable=True)
+    portfolio_convexity = Column(Float(53), nullable=True)
+    weighted_average_maturity = Column(Float(53), nullable=True)
+    analytics_version = Column(Integer, nullable=False)  # Portfolio.analytics_version the row was computed at
+    computed_at = Column(DateTime, nullable=False)  # Years to maturity age daily, so only same-day rows are used
 
 class YieldCurve(Base):
     __tablename__ = "yield_curves"
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDBinary, primary_key=True, default=lambda: str(uuid.uuid4()))
     curve_name = Column(String(100), nullable=False)
     curve_date = Column(Date, nullable=False)
     tenor = Column(String(10), nullable=False)  # e.g., "1M", "3M", "6M", "1Y", "2Y", "5Y", "10Y"
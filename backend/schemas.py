@@ -9,7 +9,7 @@ class SecurityBase(BaseModel):
     security_name: str
     security_type: SecurityType
     face_value: Decimal = Field(ge=0)
-    coupon_rate: Decimal = Field(ge=0, le=100)
+    coupon_rate: float = Field(ge=0, le=100)
     coupon_frequency: CouponFrequency
     issue_date: date
     maturity_date: date
@@ -23,7 +23,7 @@ class SecurityCreate(SecurityBase):
 
 class SecurityUpdate(BaseModel):
     security_name: Optional[str] = None
-    coupon_rate: Optional[Decimal] = None
+    coupon_rate: Optional[float] = Field(default=None, ge=0, le=100)
     credit_rating: Optional[str] = None
 
 class Security(SecurityBase):
@@ -90,7 +90,7 @@ class YieldCurveBase(BaseModel):
     curve_name: str
     curve_date: date
     tenor: str
-    yield_rate: Decimal
+    yield_rate: float
 
 class YieldCurveCreate(YieldCurveBase):
     pass
@@ -102,11 +102,11 @@ class YieldCurve(YieldCurveBase):
 # Analytics Response Schemas
 class YieldCalculation(BaseModel):
     holding_id: str
-    current_yield: Optional[Decimal] = None
-    yield_to_maturity: Optional[Decimal] = None
-    macaulay_duration: Optional[Decimal] = None
-    modified_duration: Optional[Decimal] = None
-    convexity: Optional[Decimal] = None
+    current_yield: Optional[float] = None
+    yield_to_maturity: Optional[float] = None
+    macaulay_duration: Optional[float] = None
+    modified_duration: Optional[float] = None
+    convexity: Optional[float] = None
 
 class PortfolioValuation(BaseModel):
     portfolio_id: str
@@ -118,23 +118,23 @@ class PortfolioValuation(BaseModel):
 
 class PortfolioAnalytics(BaseModel):
     portfolio_id: str
-    weighted_average_yield: Optional[Decimal] = None
-    portfolio_duration: Optional[Decimal] = None
-    portfolio_convexity: Optional[Decimal] = None
-    weighted_average_maturity: Optional[Decimal] = None
+    weighted_average_yield: Optional[float] = None
+    portfolio_duration: Optional[float] = None
+    portfolio_convexity: Optional[float] = None
+    weighted_average_maturity: Optional[float] = None
 
 class PortfolioReturns(BaseModel):
     portfolio_id: str
     start_date: date
     end_date: date
-    total_return: Decimal
-    income_return: Decimal
-    price_return: Decimal
-    time_weighted_return: Optional[Decimal] = None
+    total_return: float
+    income_return: float
+    price_return: float
+    time_weighted_return: Optional[float] = None
 
 class YTMCalculationRequest(BaseModel):
-    face_value: Decimal = Field(gt=0)
-    coupon_rate: Decimal = Field(ge=0, le=100)
+    face_value: float = Field(gt=0)
+    coupon_rate: float = Field(ge=0, le=100)
     coupon_frequency: CouponFrequency
-    years_to_maturity: Decimal = Field(gt=0)
-    current_price: Decimal = Field(gt=0)
+    years_to_maturity: float = Field(gt=0)
+    current_price: float = Field(gt=0)
@@ -1,13 +1,23 @@
-from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.decorator import cache
 from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
 from dotenv import load_dotenv
 from pathlib import Path
-from typing import List, Optional
+from typing import AsyncIterator, Iterable, List, Optional
+from contextlib import asynccontextmanager
 from datetime import date
 from decimal import Decimal
 import os
+import asyncio
+import hashlib
+import itertools
 import logging
+import orjson
 
 from database import get_db, init_db
 from models import SecurityType
@@ -29,18 +39,70 @@ from financial_calculator import FinancialCalculator
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# Initialize database on startup
-try:
-    init_db()
-    logging.info("Database initialized successfully")
-except Exception as e:
-    logging.error(f"Database initialization failed: {e}")
+# Cache read-mostly endpoints in process; keys leave out the per-request DB session
+CACHE_EXPIRE_SECONDS = 30
+
+def cache_key_builder(func, namespace="", *, request=None, response=None, args=(), kwargs=None):
+    params = {k: v for k, v in (kwargs or {}).items() if not isinstance(v, AsyncSession)}
+    return f"{namespace}:{func.__name__}:{sorted(params.items())}"
+
+FastAPICache.init(InMemoryBackend(), prefix="fixed-income", key_builder=cache_key_builder)
+
+def _orjson_default(obj):
+    # Keep Decimal precision, matching how Pydantic renders Decimal fields
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError
+
+def analytics_etag(key: str, analytics_version: int, *params) -> str:
+    """Version tag for analytics derived from a portfolio; today is part of it since results age daily"""
+    raw = ":".join(str(part) for part in (key, analytics_version, date.today(), *params))
+    return '"' + hashlib.md5(raw.encode()).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+async def iter_json_array(rows: Iterable[BaseModel]) -> AsyncIterator[bytes]:
+    """Encode models one at a time as the chunks of a JSON array"""
+    separator = b"["
+    for row in rows:
+        yield separator + row.model_dump_json().encode()
+        separator = b","
+    yield b"]" if separator == b"," else b"[]"
+
+class DecimalORJSONResponse(ORJSONResponse):
+    """orjson response that also accepts Decimals and NumPy arrays/scalars"""
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create tables (off the event loop) and compile numeric kernels once per process,
+    # so neither import nor the first request pays for them
+    try:
+        await asyncio.to_thread(init_db)
+        logging.info("Database initialized successfully")
+    except Exception as e:
+        logging.error(f"Database initialization failed: {e}")
+    # Parallel kernels must first run on the thread that serves requests: Numba's
+    # default workqueue layer hangs at exit if they are launched from a worker thread
+    FinancialCalculator.warm_up()
+    yield
 
 # Create FastAPI app
 app = FastAPI(
     title="Fixed-Income Portfolio API",
     description="RESTful API for managing fixed-income investments and calculating portfolio returns",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=DecimalORJSONResponse,
+    lifespan=lifespan
 )
 
 # Create API router
@@ -74,12 +136,14 @@ async def create_security(
     """Create a new fixed income security"""
     try:
         db_security = await SecurityService.create_security(db, security)
+        await FastAPICache.clear(namespace="securities")
         return db_security
     except Exception as e:
         logger.error(f"Error creating security: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/securities", response_model=List[Security])
+@cache(expire=CACHE_EXPIRE_SECONDS, namespace="securities")
 async def list_securities(
     security_type: Optional[SecurityType] = None,
     issuer: Optional[str] = None,
@@ -91,9 +155,10 @@ async def list_securities(
     securities = await SecurityService.list_securities(
         db, security_type=security_type, issuer=issuer, skip=skip, limit=limit
     )
-    return securities
+    return [Security.model_validate(s) for s in securities]
 
 @api_router.get("/securities/{security_id}", response_model=Security)
+@cache(expire=CACHE_EXPIRE_SECONDS, namespace="securities")
 async def get_security(
     security_id: str,
     db: AsyncSession = Depends(get_db)
@@ -102,7 +167,7 @@ async def get_security(
     security = await SecurityService.get_security(db, security_id)
     if not security:
         raise HTTPException(status_code=404, detail="Security not found")
-    return security
+    return Security.model_validate(security)
 
 @api_router.put("/securities/{security_id}", response_model=Security)
 async def update_security(
@@ -114,6 +179,9 @@ async def update_security(
     security = await SecurityService.update_security(db, security_id, security_update)
     if not security:
         raise HTTPException(status_code=404, detail="Security not found")
+    await FastAPICache.clear(namespace="securities")
+    # Portfolios holding the security had last_modified bumped
+    await FastAPICache.clear(namespace="portfolios")
     return security
 
 @api_router.delete("/securities/{security_id}", status_code=204)
@@ -125,6 +193,8 @@ async def delete_security(
     success = await SecurityService.delete_security(db, security_id)
     if not success:
         raise HTTPException(status_code=404, detail="Security not found")
+    await FastAPICache.clear(namespace="securities")
+    await FastAPICache.clear(namespace="portfolios")
     return None
 
 # ============================================================================
@@ -139,12 +209,14 @@ async def create_portfolio(
     """Create a new portfolio"""
     try:
         db_portfolio = await PortfolioService.create_portfolio(db, portfolio)
+        await FastAPICache.clear(namespace="portfolios")
         return db_portfolio
     except Exception as e:
         logger.error(f"Error creating portfolio: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/portfolios", response_model=List[Portfolio])
+@cache(expire=CACHE_EXPIRE_SECONDS, namespace="portfolios")
 async def list_portfolios(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
@@ -152,7 +224,7 @@ async def list_portfolios(
 ):
     """List all portfolios"""
     portfolios = await PortfolioService.list_portfolios(db, skip=skip, limit=limit)
-    return portfolios
+    return [Portfolio.model_validate(p) for p in portfolios]
 
 @api_router.get("/portfolios/{portfolio_id}", response_model=Portfolio)
 async def get_portfolio(
@@ -174,6 +246,7 @@ async def delete_portfolio(
     success = await PortfolioService.delete_portfolio(db, portfolio_id)
     if not success:
         raise HTTPException(status_code=404, detail="Portfolio not found")
+    await FastAPICache.clear(namespace="portfolios")
     return None
 
 # ============================================================================
@@ -190,6 +263,7 @@ async def create_holding(
     db_holding = await HoldingService.create_holding(db, portfolio_id, holding)
     if not db_holding:
         raise HTTPException(status_code=404, detail="Portfolio or Security not found")
+    await FastAPICache.clear(namespace="portfolios")
     return db_holding
 
 @api_router.get("/portfolios/{portfolio_id}/holdings", response_model=List[Holding])
@@ -223,6 +297,7 @@ async def update_holding(
     holding = await HoldingService.update_holding(db, holding_id, holding_update)
     if not holding:
         raise HTTPException(status_code=404, detail="Holding not found")
+    await FastAPICache.clear(namespace="portfolios")
     return holding
 
 @api_router.delete("/holdings/{holding_id}", status_code=204)
@@ -234,6 +309,7 @@ async def delete_holding(
     success = await HoldingService.delete_holding(db, holding_id)
     if not success:
         raise HTTPException(status_code=404, detail="Holding not found")
+    await FastAPICache.clear(namespace="portfolios")
     return None
 
 @api_router.get("/holdings/{holding_id}/schedule", response_model=List[CouponPayment])
@@ -241,11 +317,17 @@ async def get_coupon_schedule(
     holding_id: str,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get coupon payment schedule for a holding"""
-    schedule = await CouponService.generate_coupon_schedule(db, holding_id)
-    if not schedule:
+    """Get coupon payment schedule for a holding, streamed as it is generated"""
+    holding = await HoldingService.get_holding(db, holding_id)
+    schedule = CouponService.iter_coupon_schedule(holding) if holding and holding.security else None
+    # Peek at the first payment so an empty schedule still gets a 404 before streaming starts
+    first_payment = next(schedule, None) if schedule else None
+    if first_payment is None:
         raise HTTPException(status_code=404, detail="Holding not found or unable to generate schedule")
-    return schedule
+    return StreamingResponse(
+        iter_json_array(itertools.chain((first_payment,), schedule)),
+        media_type="application/json"
+    )
 
 # ============================================================================
 # ANALYTICS ENDPOINTS
@@ -254,10 +336,20 @@ async def get_coupon_schedule(
 @api_router.get("/holdings/{holding_id}/yields", response_model=YieldCalculation)
 async def calculate_holding_yields(
     holding_id: str,
+    response: Response,
     current_price: Optional[Decimal] = Query(None, description="Current market price as % of face value"),
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
     """Calculate yield metrics for a holding"""
+    analytics_version = await AnalyticsService.get_analytics_version(db, holding_id=holding_id)
+    if analytics_version is None:
+        raise HTTPException(status_code=404, detail="Holding not found")
+    etag = analytics_etag(holding_id, analytics_version, current_price)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
     yields = await AnalyticsService.calculate_holding_yields(db, holding_id, current_price)
     if not yields:
         raise HTTPException(status_code=404, detail="Holding not found")
@@ -266,10 +358,20 @@ async def calculate_holding_yields(
 @api_router.get("/portfolios/{portfolio_id}/valuation", response_model=PortfolioValuation)
 async def get_portfolio_valuation(
     portfolio_id: str,
+    response: Response,
     as_of_date: Optional[date] = Query(None, description="Valuation date (defaults to today)"),
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
     """Get portfolio valuation"""
+    analytics_version = await AnalyticsService.get_analytics_version(db, portfolio_id=portfolio_id)
+    if analytics_version is None:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    etag = analytics_etag(portfolio_id, analytics_version, as_of_date)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
     valuation = await AnalyticsService.calculate_portfolio_valuation(db, portfolio_id, as_of_date)
     if not valuation:
         raise HTTPException(status_code=404, detail="Portfolio not found")
@@ -278,9 +380,19 @@ async def get_portfolio_valuation(
 @api_router.get("/portfolios/{portfolio_id}/analytics", response_model=PortfolioAnalytics)
 async def get_portfolio_analytics(
     portfolio_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
     """Get portfolio analytics including yield, duration, and convexity"""
+    analytics_version = await AnalyticsService.get_analytics_version(db, portfolio_id=portfolio_id)
+    if analytics_version is None:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    etag = analytics_etag(portfolio_id, analytics_version)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
     analytics = await AnalyticsService.calculate_portfolio_analytics(db, portfolio_id)
     if not analytics:
         raise HTTPException(status_code=404, detail="Portfolio not found")
@@ -1,12 +1,20 @@
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, update, delete, and_, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from sqlalchemy.orm import selectinload
+from typing import Iterator, List, Optional, Tuple
 from datetime import date, datetime, timedelta
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
+import re
+import uuid
+import numpy as np
 
 from models import (
     FixedIncomeSecurity, Portfolio, PortfolioHolding, 
-    CouponPayment, YieldCurve, SecurityType, PaymentStatus
+    CouponPayment, YieldCurve, SecurityType, PaymentStatus,
+    PortfolioAnalyticsCache
 )
 from schemas import (
     SecurityCreate, SecurityUpdate,
@@ -16,12 +24,42 @@ from schemas import (
 )
 from financial_calculator import FinancialCalculator
 
+# InnoDB drops shorter words from FULLTEXT indexes (innodb_ft_min_token_size)
+FULLTEXT_MIN_TOKEN_SIZE = 3
+# InnoDB's default FULLTEXT stopwords (INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD); they are
+# never indexed, so a required "+the*" term would match nothing
+FULLTEXT_STOPWORDS = frozenset((
+    "a", "about", "an", "are", "as", "at", "be", "by", "com", "de", "en", "for", "from", "how",
+    "i", "in", "is", "it", "la", "of", "on", "or", "that", "the", "this", "to", "was", "what",
+    "when", "where", "who", "will", "with", "und", "www"
+))
+# Words as the FULLTEXT parser tokenizes them; punctuation, including the boolean-mode
+# operators, separates words
+_FULLTEXT_WORD = re.compile(r"\w+")
+
+def _round_to_column(column, value) -> Decimal:
+    """Round half-up to a Numeric column's scale, as MySQL does when storing the value"""
+    return Decimal(str(value)).quantize(Decimal(1).scaleb(-column.type.scale), rounding=ROUND_HALF_UP)
+
+# Column layout used by portfolio analytics: one record per holding
+holdings_dtype = np.dtype([
+    ("face", "f8"),
+    ("cpn", "f8"),
+    ("freq", "i4"),
+    ("years", "f8"),
+    ("price", "f8"),
+    ("qty", "f8")
+])
+
 class SecurityService:
     """Service for managing fixed income securities"""
     
     @staticmethod
     async def create_security(db: AsyncSession, security: SecurityCreate) -> FixedIncomeSecurity:
-        db_security = FixedIncomeSecurity(**security.model_dump())
+        # Create schemas are flat, so their field dict maps straight onto the columns
+        # without the copy and serialization walk of model_dump()
+        db_security = FixedIncomeSecurity(**security.__dict__)
+        SecurityService._set_coupon_terms(db_security)
         db.add(db_security)
         await db.commit()
         await db.refresh(db_security)
@@ -29,8 +67,8 @@ class SecurityService:
     
     @staticmethod
     async def get_security(db: AsyncSession, security_id: str) -> Optional[FixedIncomeSecurity]:
-        result = await db.execute(select(FixedIncomeSecurity).filter(FixedIncomeSecurity.id == security_id))
-        return result.scalar_one_or_none()
+        # Primary-key lookup: served from the session's identity map when already loaded this request
+        return await db.get(FixedIncomeSecurity, security_id)
     
     @staticmethod
     async def list_securities(
@@ -45,12 +83,24 @@ class SecurityService:
         if security_type:
             query = query.filter(FixedIncomeSecurity.security_type == security_type)
         if issuer:
-            query = query.filter(FixedIncomeSecurity.issuer.like(f"%{issuer}%"))
+            query = query.filter(SecurityService._issuer_filter(db, issuer))
         
         query = query.offset(skip).limit(limit)
         result = await db.execute(query)
         return result.scalars().all()
     
+    @staticmethod
+    def _issuer_filter(db: AsyncSession, issuer: str):
+        """Word-prefix search on the FULLTEXT issuer index, LIKE where that can't be used"""
+        words = _FULLTEXT_WORD.findall(issuer)
+        if (
+            db.get_bind().dialect.name != "mysql"
+            or not words
+            or any(len(word) < FULLTEXT_MIN_TOKEN_SIZE or word.lower() in FULLTEXT_STOPWORDS for word in words)
+        ):
+            return FixedIncomeSecurity.issuer.like(f"%{issuer}%")
+        return FixedIncomeSecurity.issuer.match(" ".join(f"+{word}*" for word in words))
+    
     @staticmethod
     async def update_security(
         db: AsyncSession, 
@@ -64,7 +114,9 @@ class SecurityService:
         update_data = security_update.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_security, field, value)
+        SecurityService._set_coupon_terms(db_security)
         
+        await AnalyticsService.invalidate_security_analytics(db, security_id)
         await db.commit()
         await db.refresh(db_security)
         return db_security
@@ -75,16 +127,39 @@ class SecurityService:
         if not db_security:
             return False
         
+        await AnalyticsService.invalidate_security_analytics(db, security_id)
         await db.delete(db_security)
         await db.commit()
         return True
 
+    @staticmethod
+    def _set_coupon_terms(db_security: FixedIncomeSecurity) -> None:
+        """Store the annual coupon amount and payments per year on the security
+        Face value and coupon rate are rounded to their column scales first, so the amount
+        agrees with the values the database keeps
+        """
+        db_security.face_value = _round_to_column(FixedIncomeSecurity.face_value, db_security.face_value)
+        db_security.coupon_rate = _round_to_column(FixedIncomeSecurity.coupon_rate, db_security.coupon_rate)
+        db_security.annual_coupon_amount = db_security.face_value * db_security.coupon_rate / Decimal("100")
+        db_security.payments_per_year = FinancialCalculator.get_frequency_multiplier(db_security.coupon_frequency)
+    
+    @staticmethod
+    def coupon_terms(security: FixedIncomeSecurity) -> Tuple[Decimal, int]:
+        """Annual coupon amount and payments per year, derived here for rows stored without them"""
+        annual_coupon = security.annual_coupon_amount
+        if annual_coupon is None:
+            annual_coupon = security.face_value * (security.coupon_rate / Decimal("100"))
+        payments_per_year = security.payments_per_year
+        if payments_per_year is None:
+            payments_per_year = FinancialCalculator.get_frequency_multiplier(security.coupon_frequency)
+        return annual_coupon, payments_per_year
+
 class PortfolioService:
     """Service for managing portfolios"""
     
     @staticmethod
     async def create_portfolio(db: AsyncSession, portfolio: PortfolioCreate) -> Portfolio:
-        db_portfolio = Portfolio(**portfolio.model_dump())
+        db_portfolio = Portfolio(**portfolio.__dict__)
         db.add(db_portfolio)
         await db.commit()
         await db.refresh(db_portfolio)
@@ -92,8 +167,7 @@ class PortfolioService:
     
     @staticmethod
     async def get_portfolio(db: AsyncSession, portfolio_id: str) -> Optional[Portfolio]:
-        result = await db.execute(select(Portfolio).filter(Portfolio.id == portfolio_id))
-        return result.scalar_one_or_none()
+        return await db.get(Portfolio, portfolio_id)
     
     @staticmethod
     async def list_portfolios(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Portfolio]:
@@ -106,6 +180,7 @@ class PortfolioService:
         if not db_portfolio:
             return False
         
+        await AnalyticsService.invalidate_portfolio_analytics(db, portfolio_id)
         await db.delete(db_portfolio)
         await db.commit()
         return True
@@ -128,13 +203,18 @@ class HoldingService:
         
         db_holding = PortfolioHolding(
             portfolio_id=portfolio_id,
-            **holding.model_dump()
+            **holding.__dict__
         )
         db.add(db_holding)
         
-        # Update portfolio total invested
-        investment = float(holding.purchase_price) * float(holding.quantity) * float(security.face_value) / 100
-        portfolio.total_invested = float(portfolio.total_invested) + investment
+        # Update portfolio total invested in the database, as one atomic increment
+        investment = holding.purchase_price * holding.quantity * security.face_value / Decimal("100")
+        await db.execute(
+            update(Portfolio)
+            .where(Portfolio.id == portfolio_id)
+            .values(total_invested=Portfolio.total_invested + investment)
+        )
+        await AnalyticsService.invalidate_portfolio_analytics(db, portfolio_id)
         
         await db.commit()
         await db.refresh(db_holding)
@@ -144,6 +224,7 @@ class HoldingService:
     async def get_holding(db: AsyncSession, holding_id: str) -> Optional[PortfolioHolding]:
         result = await db.execute(
             select(PortfolioHolding)
+            .options(selectinload(PortfolioHolding.security))
             .filter(PortfolioHolding.id == holding_id)
         )
         return result.scalar_one_or_none()
@@ -154,7 +235,11 @@ class HoldingService:
         portfolio_id: str,
         current_only: bool = True
     ) -> List[PortfolioHolding]:
-        query = select(PortfolioHolding).filter(PortfolioHolding.portfolio_id == portfolio_id)
+        query = (
+            select(PortfolioHolding)
+            .options(selectinload(PortfolioHolding.security))
+            .filter(PortfolioHolding.portfolio_id == portfolio_id)
+        )
         
         if current_only:
             query = query.filter(PortfolioHolding.current_holding == True)
@@ -176,6 +261,7 @@ class HoldingService:
         for field, value in update_data.items():
             setattr(db_holding, field, value)
         
+        await AnalyticsService.invalidate_portfolio_analytics(db, db_holding.portfolio_id)
         await db.commit()
         await db.refresh(db_holding)
         return db_holding
@@ -188,6 +274,7 @@ class HoldingService:
             return False
         
         db_holding.current_holding = False
+        await AnalyticsService.invalidate_portfolio_analytics(db, db_holding.portfolio_id)
         await db.commit()
         return True
 
@@ -206,61 +293,49 @@ class AnalyticsService:
         if not holding:
             return None
         
-        result = await db.execute(
-            select(FixedIncomeSecurity).filter(FixedIncomeSecurity.id == holding.security_id)
-        )
-        security = result.scalar_one_or_none()
+        security = holding.security
         if not security:
             return None
         
         # Use purchase price if current price not provided
         price = current_price or holding.purchase_price
         
+        return AnalyticsService._yields_from_objects(security, holding, price, date.today())
+    
+    @staticmethod
+    def _yields_from_objects(
+        security: FixedIncomeSecurity,
+        holding: PortfolioHolding,
+        price: Decimal,
+        today: date
+    ) -> YieldCalculation:
+        """Yield metrics for an already-loaded holding and security, without touching the DB"""
+        holding_id = holding.id
+        
+        # Metrics only need float precision; Decimal stays at the model boundary
+        face_value = float(security.face_value)
+        coupon_rate = float(security.coupon_rate)
+        market_price = face_value * (float(price) / 100)
+        
         # Calculate years to maturity
-        today = date.today()
-        years_to_maturity = Decimal(str((security.maturity_date - today).days / 365.25))
+        years_to_maturity = (security.maturity_date - today).days / 365.25
         
         if years_to_maturity <= 0:
             return YieldCalculation(holding_id=holding_id)
         
         # Current Yield
-        annual_coupon = security.face_value * (security.coupon_rate / Decimal("100"))
-        current_yield = FinancialCalculator.calculate_current_yield(
-            annual_coupon, 
-            security.face_value * (price / Decimal("100"))
-        )
-        
-        # Yield to Maturity
-        ytm = FinancialCalculator.calculate_ytm(
-            security.face_value,
-            security.coupon_rate,
-            security.coupon_frequency,
+        annual_coupon, payments_per_year = SecurityService.coupon_terms(security)
+        current_yield = FinancialCalculator.calculate_current_yield(float(annual_coupon), market_price)
+        
+        # Yield to Maturity, Duration and Convexity from one kernel call
+        ytm, macaulay_duration, modified_duration, convexity = FinancialCalculator.calculate_all_metrics(
+            face_value,
+            coupon_rate,
+            payments_per_year,
             years_to_maturity,
-            security.face_value * (price / Decimal("100"))
+            market_price
         )
         
-        # Duration and Convexity
-        macaulay_duration = None
-        modified_duration = None
-        convexity = None
-        
-        if ytm:
-            macaulay_duration, modified_duration = FinancialCalculator.calculate_duration(
-                security.face_value,
-                security.coupon_rate,
-                security.coupon_frequency,
-                years_to_maturity,
-                ytm
-            )
-            
-            convexity = FinancialCalculator.calculate_convexity(
-                security.face_value,
-                security.coupon_rate,
-                security.coupon_frequency,
-                years_to_maturity,
-                ytm
-            )
-        
         return YieldCalculation(
             holding_id=holding_id,
             current_yield=current_yield,
@@ -282,21 +357,24 @@ class AnalyticsService:
         if not portfolio:
             return None
         
-        holdings = await HoldingService.list_holdings(db, portfolio_id, current_only=True)
-        
-        total_market_value = Decimal("0.0")
-        total_cost_basis = Decimal("0.0")
-        
-        for holding in holdings:
-            result = await db.execute(
-                select(FixedIncomeSecurity).filter(FixedIncomeSecurity.id == holding.security_id)
+        # Aggregate in the database: one row back however many holdings there are
+        result = await db.execute(
+            select(
+                func.sum(
+                    FixedIncomeSecurity.face_value * PortfolioHolding.quantity * PortfolioHolding.purchase_price / 100
+                ),
+                func.count()
             )
-            security = result.scalar_one_or_none()
-            if security:
-                # Market value (using purchase price as proxy)
-                market_value = security.face_value * holding.quantity * (holding.purchase_price / Decimal("100"))
-                total_market_value += market_value
-                total_cost_basis += market_value
+            .select_from(PortfolioHolding)
+            .join(FixedIncomeSecurity, FixedIncomeSecurity.id == PortfolioHolding.security_id)
+            .filter(PortfolioHolding.portfolio_id == portfolio_id)
+            .filter(PortfolioHolding.current_holding == True)
+        )
+        market_value, holdings_count = result.one()
+        
+        # Market value (using purchase price as proxy)
+        total_market_value = Decimal(market_value or 0)
+        total_cost_basis = total_market_value
         
         unrealized_gain_loss = total_market_value - total_cost_basis
         
@@ -306,7 +384,7 @@ class AnalyticsService:
             total_market_value=total_market_value,
             total_cost_basis=total_cost_basis,
             unrealized_gain_loss=unrealized_gain_loss,
-            holdings_count=len(holdings)
+            holdings_count=holdings_count
         )
     
     @staticmethod
@@ -316,53 +394,168 @@ class AnalyticsService:
     ) -> Optional[PortfolioAnalytics]:
         """Calculate portfolio analytics including weighted average yield and duration"""
         
-        holdings = await HoldingService.list_holdings(db, portfolio_id, current_only=True)
-        if not holdings:
-            return PortfolioAnalytics(portfolio_id=portfolio_id)
-        
-        total_value = Decimal("0.0")
-        weighted_yield = Decimal("0.0")
-        weighted_duration = Decimal("0.0")
-        weighted_convexity = Decimal("0.0")
-        weighted_maturity = Decimal("0.0")
-        
-        for holding in holdings:
-            result = await db.execute(
-                select(FixedIncomeSecurity).filter(FixedIncomeSecurity.id == holding.security_id)
-            )
-            security = result.scalar_one_or_none()
-            if not security:
-                continue
-            
-            holding_value = security.face_value * holding.quantity
-            total_value += holding_value
-            
-            # Calculate yield for this holding
-            yield_calc = await AnalyticsService.calculate_holding_yields(db, holding.id)
-            if yield_calc and yield_calc.yield_to_maturity:
-                weighted_yield += yield_calc.yield_to_maturity * holding_value
-            
-            if yield_calc and yield_calc.modified_duration:
-                weighted_duration += yield_calc.modified_duration * holding_value
-            
-            if yield_calc and yield_calc.convexity:
-                weighted_convexity += yield_calc.convexity * holding_value
-            
-            # Years to maturity
-            years_to_mat = Decimal(str((security.maturity_date - date.today()).days / 365.25))
-            if years_to_mat > 0:
-                weighted_maturity += years_to_mat * holding_value
-        
-        if total_value > 0:
+        # Serve today's cached result if no holding or security write has bumped the version since;
+        # the version is read before the holdings so a result is never stamped newer than its inputs
+        today = date.today()
+        analytics_version = await AnalyticsService.get_analytics_version(db, portfolio_id=portfolio_id)
+        cached = await db.get(PortfolioAnalyticsCache, portfolio_id)
+        if (
+            cached
+            and cached.analytics_version == analytics_version
+            and cached.computed_at.date() == today
+        ):
             return PortfolioAnalytics(
                 portfolio_id=portfolio_id,
-                weighted_average_yield=weighted_yield / total_value,
-                portfolio_duration=weighted_duration / total_value,
-                portfolio_convexity=weighted_convexity / total_value,
-                weighted_average_maturity=weighted_maturity / total_value
+                weighted_average_yield=cached.weighted_average_yield,
+                portfolio_duration=cached.portfolio_duration,
+                portfolio_convexity=cached.portfolio_convexity,
+                weighted_average_maturity=cached.weighted_average_maturity
             )
         
-        return PortfolioAnalytics(portfolio_id=portfolio_id)
+        # Project only the numeric columns of every current holding in a single query
+        result = await db.execute(
+            select(
+                FixedIncomeSecurity.face_value,
+                FixedIncomeSecurity.coupon_rate,
+                FixedIncomeSecurity.coupon_frequency,
+                FixedIncomeSecurity.payments_per_year,
+                FixedIncomeSecurity.maturity_date,
+                PortfolioHolding.purchase_price,
+                PortfolioHolding.quantity
+            )
+            .join(FixedIncomeSecurity, FixedIncomeSecurity.id == PortfolioHolding.security_id)
+            .filter(PortfolioHolding.portfolio_id == portfolio_id)
+            .filter(PortfolioHolding.current_holding == True)
+        )
+        rows = result.all()
+        if not rows:
+            return PortfolioAnalytics(portfolio_id=portfolio_id)
+        
+        holdings = np.fromiter(
+            (
+                (
+                    float(face_value),
+                    float(coupon_rate),
+                    payments_per_year if payments_per_year is not None
+                    else FinancialCalculator.get_frequency_multiplier(coupon_frequency),
+                    (maturity_date - today).days / 365.25,
+                    float(purchase_price),
+                    float(quantity)
+                )
+                for face_value, coupon_rate, coupon_frequency, payments_per_year, maturity_date, purchase_price, quantity in rows
+            ),
+            dtype=holdings_dtype,
+            count=len(rows)
+        )
+        face = holdings["face"]
+        coupon = holdings["cpn"]
+        freq = holdings["freq"].astype(np.float64)
+        years = holdings["years"]
+        price = face * holdings["price"] / 100
+        holding_value = face * holdings["qty"]
+        
+        total_value = holding_value.sum()
+        if total_value <= 0:
+            return PortfolioAnalytics(portfolio_id=portfolio_id)
+        
+        # Yield metrics for all holdings that have not matured, priced at purchase price
+        live = years > 0
+        ytm = np.full(len(rows), np.nan)
+        ytm[live] = FinancialCalculator.calculate_ytm_batch(face[live], coupon[live], freq[live], years[live], price[live])
+        
+        # A solved yield of exactly 0 still has duration and convexity, as in calculate_holding_yields
+        has_ytm = ~np.isnan(ytm)
+        modified_duration = np.full(len(rows), np.nan)
+        convexity = np.full(len(rows), np.nan)
+        _, modified_duration[has_ytm] = FinancialCalculator.calculate_duration_batch(
+            face[has_ytm], coupon[has_ytm], freq[has_ytm], years[has_ytm], ytm[has_ytm]
+        )
+        convexity[has_ytm] = FinancialCalculator.calculate_convexity_batch(
+            face[has_ytm], coupon[has_ytm], freq[has_ytm], years[has_ytm], ytm[has_ytm]
+        )
+        
+        def weighted_average(metric: np.ndarray) -> float:
+            # Holdings without the metric (NaN or zero) count towards total value only
+            contributes = ~np.isnan(metric) & (metric != 0)
+            return float((metric[contributes] * holding_value[contributes]).sum() / total_value)
+        
+        analytics = PortfolioAnalytics(
+            portfolio_id=portfolio_id,
+            weighted_average_yield=weighted_average(ytm),
+            portfolio_duration=weighted_average(modified_duration),
+            portfolio_convexity=weighted_average(convexity),
+            weighted_average_maturity=float((years[live] * holding_value[live]).sum() / total_value)
+        )
+        
+        if analytics_version is not None:
+            await AnalyticsService._store_analytics(db, analytics, analytics_version)
+        return analytics
+    
+    @staticmethod
+    async def _store_analytics(db: AsyncSession, analytics: PortfolioAnalytics, analytics_version: int) -> None:
+        """Upsert the cache row in one statement; caching is skipped if the write conflicts"""
+        values = analytics.model_dump()
+        values.update(analytics_version=analytics_version, computed_at=datetime.now())
+        changed = [column for column in values if column != "portfolio_id"]
+        
+        dialect = db.get_bind().dialect.name
+        if dialect == "mysql":
+            stmt = mysql_insert(PortfolioAnalyticsCache).values(**values)
+            stmt = stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in changed})
+        elif dialect == "sqlite":
+            stmt = sqlite_insert(PortfolioAnalyticsCache).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[PortfolioAnalyticsCache.portfolio_id],
+                set_={column: stmt.excluded[column] for column in changed}
+            )
+        else:
+            return
+        try:
+            await db.execute(stmt)
+            await db.commit()
+        except SQLAlchemyError:
+            # Portfolio deleted or row locked by a concurrent write: serve the result uncached
+            await db.rollback()
+    
+    @staticmethod
+    async def invalidate_portfolio_analytics(db: AsyncSession, portfolio_id: str) -> None:
+        """Drop cached analytics for a portfolio; runs in the caller's transaction"""
+        await db.execute(
+            delete(PortfolioAnalyticsCache).where(PortfolioAnalyticsCache.portfolio_id == portfolio_id)
+        )
+        await db.execute(
+            update(Portfolio)
+            .where(Portfolio.id == portfolio_id)
+            .values(analytics_version=Portfolio.analytics_version + 1, last_modified=func.now())
+        )
+    
+    @staticmethod
+    async def invalidate_security_analytics(db: AsyncSession, security_id: str) -> None:
+        """Drop cached analytics for every portfolio holding a security"""
+        holder_ids = select(PortfolioHolding.portfolio_id).filter(PortfolioHolding.security_id == security_id)
+        await db.execute(
+            delete(PortfolioAnalyticsCache).where(PortfolioAnalyticsCache.portfolio_id.in_(holder_ids))
+        )
+        await db.execute(
+            update(Portfolio)
+            .where(Portfolio.id.in_(holder_ids))
+            .values(analytics_version=Portfolio.analytics_version + 1, last_modified=func.now())
+        )
+    
+    @staticmethod
+    async def get_analytics_version(
+        db: AsyncSession,
+        portfolio_id: Optional[str] = None,
+        holding_id: Optional[str] = None
+    ) -> Optional[int]:
+        """analytics_version of a portfolio, or of the portfolio owning a holding"""
+        query = select(Portfolio.analytics_version)
+        if holding_id:
+            query = query.join(PortfolioHolding).filter(PortfolioHolding.id == holding_id)
+        else:
+            query = query.filter(Portfolio.id == portfolio_id)
+        result = await db.execute(query)
+        return result.scalar_one_or_none()
 
 class CouponService:
     """Service for coupon schedule generation"""
@@ -375,15 +568,16 @@ class CouponService:
         """Generate coupon payment schedule for a holding"""
         
         holding = await HoldingService.get_holding(db, holding_id)
-        if not holding:
+        if not holding or not holding.security:
             return []
         
-        result = await db.execute(
-            select(FixedIncomeSecurity).filter(FixedIncomeSecurity.id == holding.security_id)
-        )
-        security = result.scalar_one_or_none()
-        if not security:
-            return []
+        return list(CouponService.iter_coupon_schedule(holding))
+    
+    @staticmethod
+    def iter_coupon_schedule(holding: PortfolioHolding) -> Iterator[CouponPaymentSchema]:
+        """Yield the coupon payments of a holding (with its security loaded) in date order"""
+        
+        security = holding.security
         
         # Generate coupon dates from purchase date to maturity
         coupon_dates = FinancialCalculator.generate_coupon_dates(
@@ -394,40 +588,31 @@ class CouponService:
         )
         
         # Calculate coupon payment amount
-        freq_multiplier = FinancialCalculator.get_frequency_multiplier(security.coupon_frequency)
+        annual_coupon, freq_multiplier = SecurityService.coupon_terms(security)
         if freq_multiplier == 0:
             # Zero coupon - return face value at maturity
-            payment_amount = security.face_value * holding.quantity
-            return [
-                CouponPaymentSchema(
-                    id=str(datetime.now().timestamp()),
-                    holding_id=holding_id,
-                    payment_date=security.maturity_date,
-                    payment_amount=payment_amount,
-                    accrued_days=0,
-                    status=PaymentStatus.PROJECTED
-                )
-            ]
+            yield CouponPaymentSchema(
+                id=str(uuid.uuid4()),
+                holding_id=holding.id,
+                payment_date=security.maturity_date,
+                payment_amount=security.face_value * holding.quantity,
+                accrued_days=0,
+                status=PaymentStatus.PROJECTED
+            )
+            return
         
-        annual_coupon = security.face_value * (security.coupon_rate / Decimal("100"))
         coupon_payment = (annual_coupon / Decimal(str(freq_multiplier))) * holding.quantity
         
         # Create coupon payment schedule
-        schedule = []
-        prev_date = security.issue_date
-        
-        for payment_date in coupon_dates:
-            accrued_days = (payment_date - prev_date).days
-            
-            schedule.append(CouponPaymentSchema(
-                id=str(datetime.now().timestamp()) + str(len(schedule)),
-                holding_id=holding_id,
+        accrued_days = FinancialCalculator.calculate_coupon_period_days(security.issue_date, coupon_dates)
+        today = date.today()
+        
+        for payment_date, days in zip(coupon_dates, accrued_days.tolist()):
+            yield CouponPaymentSchema(
+                id=str(uuid.uuid4()),
+                holding_id=holding.id,
                 payment_date=payment_date,
                 payment_amount=coupon_payment,
-                accrued_days=accrued_days,
-                status=PaymentStatus.PROJECTED if payment_date > date.today() else PaymentStatus.PAID
-            ))
-            
-            prev_date = payment_date
-        
-        return schedule
+                accrued_days=days,
+                status=PaymentStatus.PROJECTED if payment_date > today else PaymentStatus.PAID
+            )
@@ -1,30 +1,43 @@
 import asyncio
+import sys
 import aiomysql
-import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Same connection settings as the app, read after .env is loaded
+from database import MYSQL_HOST, MYSQL_PORT, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DATABASE, ssl_context
+
+# Secondary indexes declared on the models; create_all skips tables that already exist,
+# so older databases get them here: (table, index name, columns)
+INDEXES = [
+    ('fixed_income_securities', 'ix_securities_type_issuer', 'security_type, issuer'),
+    ('portfolio_holdings', 'ix_holdings_portfolio_current', 'portfolio_id, current_holding'),
+    ('portfolio_holdings', 'ix_holdings_security', 'security_id'),
+    ('coupon_payments', 'ix_coupons_holding', 'holding_id'),
+]
+
+# Word search on issuer names
+FULLTEXT_INDEXES = [
+    ('fixed_income_securities', 'ft_issuer', 'issuer'),
+]
+
 async def setup_database():
     try:
         # Connection details
-        host = os.getenv('MYSQL_HOST')
-        port = int(os.getenv('MYSQL_PORT'))
-        user = os.getenv('MYSQL_USER')
-        password = os.getenv('MYSQL_PASSWORD')
-        db_name = os.getenv('MYSQL_DATABASE', 'fixed_income_db')
+        db_name = MYSQL_DATABASE
         
-        print(f"📡 Connecting to MySQL at {host}:{port}...")
+        print(f"📡 Connecting to MySQL at {MYSQL_HOST}:{MYSQL_PORT}...")
         
         # First connect without database to create it
         pool = await aiomysql.create_pool(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
+            host=MYSQL_HOST,
+            port=int(MYSQL_PORT),
+            user=MYSQL_USER,
+            password=MYSQL_PASSWORD,
             db='defaultdb',  # Connect to default database first
             autocommit=True,
-            ssl={'ca': '/etc/secrets/ca.pem'}
+            ssl=ssl_context
         )
         
         async with pool.acquire() as conn:
@@ -45,13 +58,13 @@ async def setup_database():
         
         # Now connect to the actual database
         pool = await aiomysql.create_pool(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
+            host=MYSQL_HOST,
+            port=int(MYSQL_PORT),
+            user=MYSQL_USER,
+            password=MYSQL_PASSWORD,
             db=db_name,
             autocommit=True,
-            ssl={'ca': '/etc/secrets/ca.pem'}
+            ssl=ssl_context
         )
         
         async with pool.acquire() as conn:
@@ -59,7 +72,7 @@ async def setup_database():
                 # Create tables (simplified version)
                 await cursor.execute("""
                     CREATE TABLE IF NOT EXISTS fixed_income_securities (
-                        id VARCHAR(36) PRIMARY KEY,
+                        id BINARY(16) PRIMARY KEY,
                         security_name VARCHAR(255) NOT NULL,
                         security_type VARCHAR(50) NOT NULL,
                         face_value DECIMAL(15,2) NOT NULL,
@@ -70,22 +83,103 @@ async def setup_database():
                         day_count_convention VARCHAR(20),
                         currency VARCHAR(3) DEFAULT 'USD',
                         issuer VARCHAR(255),
-                        credit_rating VARCHAR(20)
+                        credit_rating VARCHAR(20),
+                        annual_coupon_amount DECIMAL(20,6),
+                        payments_per_year INT
                     )
                 """)
                 print("✅ Table 'fixed_income_securities' created/verified")
                 
+                # Add the derived coupon columns to older tables and fill them in
+                for column, definition in [('annual_coupon_amount', 'DECIMAL(20,6)'), ('payments_per_year', 'INT')]:
+                    await cursor.execute(
+                        "SELECT COUNT(*) FROM information_schema.COLUMNS "
+                        "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'fixed_income_securities' AND COLUMN_NAME = %s",
+                        (db_name, column)
+                    )
+                    if (await cursor.fetchone())[0] == 0:
+                        await cursor.execute(f"ALTER TABLE fixed_income_securities ADD COLUMN {column} {definition}")
+                
+                await cursor.execute("""
+                    UPDATE fixed_income_securities
+                    SET annual_coupon_amount = face_value * coupon_rate / 100,
+                        payments_per_year = CASE coupon_frequency
+                            WHEN 'MONTHLY' THEN 12
+                            WHEN 'QUARTERLY' THEN 4
+                            WHEN 'SEMI_ANNUAL' THEN 2
+                            WHEN 'ANNUAL' THEN 1
+                            ELSE 0
+                        END
+                    WHERE annual_coupon_amount IS NULL OR payments_per_year IS NULL
+                """)
+                print("✅ Derived coupon columns populated")
+                
                 # Create portfolios table
                 await cursor.execute("""
                     CREATE TABLE IF NOT EXISTS portfolios (
-                        id VARCHAR(36) PRIMARY KEY,
+                        id BINARY(16) PRIMARY KEY,
                         portfolio_name VARCHAR(255) NOT NULL,
                         description TEXT,
                         created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        last_modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+                        last_modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                        analytics_version INT NOT NULL DEFAULT 0
                     )
                 """)
+                
+                await cursor.execute(
+                    "SELECT COUNT(*) FROM information_schema.COLUMNS "
+                    "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'portfolios' AND COLUMN_NAME = 'analytics_version'",
+                    (db_name,)
+                )
+                if (await cursor.fetchone())[0] == 0:
+                    await cursor.execute("ALTER TABLE portfolios ADD COLUMN analytics_version INT NOT NULL DEFAULT 0")
                 print("✅ Table 'portfolios' created/verified")
+                
+                # Create portfolio analytics cache table
+                await cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS portfolio_analytics_cache (
+                        portfolio_id BINARY(16) PRIMARY KEY,
+                        weighted_average_yield DOUBLE,
+                        portfolio_duration DOUBLE,
+                        portfolio_convexity DOUBLE,
+                        weighted_average_maturity DOUBLE,
+                        analytics_version INT NOT NULL,
+                        computed_at DATETIME NOT NULL,
+                        FOREIGN KEY (portfolio_id) REFERENCES portfolios(id) ON DELETE CASCADE
+                    )
+                """)
+                
+                await cursor.execute(
+                    "SELECT COUNT(*) FROM information_schema.COLUMNS "
+                    "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'portfolio_analytics_cache' "
+                    "AND COLUMN_NAME = 'analytics_version'",
+                    (db_name,)
+                )
+                if (await cursor.fetchone())[0] == 0:
+                    # Unversioned rows can't be validated; they are only a cache, so drop them
+                    await cursor.execute("DELETE FROM portfolio_analytics_cache")
+                    await cursor.execute("ALTER TABLE portfolio_analytics_cache ADD COLUMN analytics_version INT NOT NULL")
+                print("✅ Table 'portfolio_analytics_cache' created/verified")
+                
+                # Add any missing indexes on tables that exist
+                for kind, indexes in (('INDEX', INDEXES), ('FULLTEXT INDEX', FULLTEXT_INDEXES)):
+                    for table, index_name, columns in indexes:
+                        await cursor.execute(
+                            "SELECT COUNT(*) FROM information_schema.TABLES "
+                            "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+                            (db_name, table)
+                        )
+                        if (await cursor.fetchone())[0] == 0:
+                            continue
+                        
+                        await cursor.execute(
+                            "SELECT COUNT(*) FROM information_schema.STATISTICS "
+                            "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND INDEX_NAME = %s",
+                            (db_name, table, index_name)
+                        )
+                        if (await cursor.fetchone())[0] == 0:
+                            await cursor.execute(f"CREATE {kind} {index_name} ON {table} ({columns})")
+                        print(f"✅ Index '{index_name}' created/verified")
         
         pool.close()
         await pool.wait_closed()
@@ -98,4 +192,4 @@ async def setup_database():
         return False
 
 if __name__ == "__main__":
-    asyncio.run(setup_database())
+    sys.exit(0 if asyncio.run(setup_database()) else 1)
@@ -13,18 +13,15 @@ class Settings:
     MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "password")
     MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "fixed_income_db")
     
-    # SSL for Aiven
-    SSL_CA_PATH = os.getenv("SSL_CA_PATH", "./ca.pem")
-    USE_SSL = os.getenv("ENVIRONMENT") == "production"
+    # SSL for Aiven; same variables and defaults as backend/database.py, which builds the SSL context
+    SSL_CA_PATH = os.getenv("SSL_CA_PATH", "/etc/secrets/ca.pem")
+    USE_SSL = os.getenv(
+        "DB_SSL", "true" if os.getenv("ENVIRONMENT", "development") in ("production", "development") else "false"
+    ).lower() == "true"
     
     @property
     def DATABASE_URL(self):
-        """Get database URL with SSL parameters for Aiven"""
-        base_url = f"mysql+pymysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{self.MYSQL_HOST}:{self.MYSQL_PORT}/{self.MYSQL_DATABASE}"
-        
-        if self.USE_SSL:
-            return f"{base_url}?ssl_ca={self.SSL_CA_PATH}&ssl_verify_identity=true"
-        else:
-            return base_url
+        """Get async (aiomysql) database URL; SSL is passed to the engine separately"""
+        return f"mysql+aiomysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{self.MYSQL_HOST}:{self.MYSQL_PORT}/{self.MYSQL_DATABASE}?charset=utf8mb4"
 
 settings = Settings()
@@ -5,5 +5,9 @@ if [ ! -z "$CA_PEM" ]; then
     export SSL_CA_PATH=/etc/secrets/ca.pem
 fi
 
-# Start the application
-uvicorn main:app --host 0.0.0.0 --port ${PORT:-8000}
+# Bring an existing database up to the current schema (create_all never alters tables).
+# UUID keys go first: setup_db adds foreign keys that need the BINARY(16) ids.
+python backend/migrate_uuid_binary.py && python backend/setup_db.py || exit 1
+
+# Start the application on uvloop with the httptools parser (both ship with uvicorn[standard])
+uvicorn main:app --host 0.0.0.0 --port ${PORT:-8000} --loop uvloop --http httptools
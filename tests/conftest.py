@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# Backend modules import each other as top-level modules (from models import ...)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# models imports database, which builds the engine at import time; no server is contacted
+os.environ.setdefault("DB_SSL", "false")
@@ -0,0 +1,235 @@
+"""Pricing kernels and coupon schedules checked against straightforward per-period loops"""
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from financial_calculator import FinancialCalculator
+from financial_calculator_kernels import (
+    annuity_sums, price_and_derivative, ytm_kernel, ytm_batch,
+    duration_kernel, convexity_kernel, metrics_kernel
+)
+from models import CouponFrequency, DayCountConvention
+
+TOLERANCE = 0.0001
+MAX_ITERATIONS = 100
+
+# Reference implementations: coupons at whole periods 1..int(periods), face value at `periods`
+
+def reference_cash_flows(coupon_payment, face, periods):
+    times = list(range(1, int(periods) + 1))
+    return [(t, coupon_payment) for t in times] + [(periods, face)]
+
+def reference_price(periodic_yield, coupon_payment, face, periods):
+    return sum(cf / (1 + periodic_yield) ** t for t, cf in reference_cash_flows(coupon_payment, face, periods))
+
+def reference_risk(face, coupon_rate, freq, years, ytm):
+    """(macaulay, modified, convexity) for an annual YTM in percent"""
+    coupon_payment = face * (coupon_rate / 100) / freq
+    periods = years * freq
+    y = ytm / 100 / freq
+    flows = reference_cash_flows(coupon_payment, face, periods)
+    total = sum(cf / (1 + y) ** t for t, cf in flows)
+    weighted = sum(t * cf / (1 + y) ** t for t, cf in flows) / freq
+    convex = sum(t * (t + 1) * cf / (1 + y) ** t for t, cf in flows)
+    macaulay = weighted / total
+    return macaulay, macaulay / (1 + y), convex / (total * freq ** 2 * (1 + y) ** 2)
+
+# Annuity sums: closed form and the Taylor branch near y = 0
+
+@pytest.mark.parametrize("periodic_yield", [0.0, 1e-9, -1e-7, 2e-6, 5e-5, 1e-3, 0.025, 0.08, -0.2])
+@pytest.mark.parametrize("n", [1, 2, 10, 60, 360])
+def test_annuity_sums_match_loop(periodic_yield, n):
+    v = 1 / (1 + periodic_yield)
+    expected = (
+        sum(v ** t for t in range(1, n + 1)),
+        sum(t * v ** t for t in range(1, n + 1)),
+        sum(t * (t + 1) * v ** t for t in range(1, n + 1)),
+    )
+    actual = annuity_sums(periodic_yield, n, (1 + periodic_yield) ** -n)
+    np.testing.assert_allclose(actual, expected, rtol=1e-8)
+
+@pytest.mark.parametrize("periodic_yield", [0.0, 1e-8, 0.02, 0.05])
+@pytest.mark.parametrize("periods", [0.5, 1.0, 7.3, 12.0, 59.9])
+def test_price_and_derivative_match_loop(periodic_yield, periods):
+    coupon_payment, face = 25.0, 1000.0
+    pv, pv_derivative = price_and_derivative(periodic_yield, coupon_payment, face, periods)
+    assert pv == pytest.approx(reference_price(periodic_yield, coupon_payment, face, periods), rel=1e-10)
+
+    step = 1e-6
+    numeric = (
+        reference_price(periodic_yield + step, coupon_payment, face, periods)
+        - reference_price(periodic_yield - step, coupon_payment, face, periods)
+    ) / (2 * step)
+    assert pv_derivative == pytest.approx(numeric, rel=1e-6)
+
+# Yield to maturity
+
+@pytest.mark.parametrize("face, coupon_rate, freq, years, price", [
+    (1000.0, 5.0, 2.0, 10.0, 950.0),
+    (1000.0, 5.0, 2.0, 3.7, 1020.0),     # fractional periods
+    (100.0, 7.25, 12.0, 29.9, 88.0),
+    (5000.0, 3.0, 4.0, 0.4, 4990.0),     # less than two periods left
+    (1000.0, 4.0, 1.0, 3.0, 1120.0),     # price equals undiscounted cash flows: zero yield
+    (1000.0, 6.0, 1.0, 5.0, 1400.0),     # negative yield inside the bracket
+])
+def test_ytm_reprices_bond(face, coupon_rate, freq, years, price):
+    ytm = ytm_kernel(face, coupon_rate, freq, years, price, TOLERANCE, MAX_ITERATIONS)
+    assert not np.isnan(ytm)
+    coupon_payment = face * (coupon_rate / 100) / freq
+    assert reference_price(ytm / 100 / freq, coupon_payment, face, years * freq) == pytest.approx(price, rel=1e-9)
+
+def test_ytm_outside_bracket_uses_newton_fallback():
+    face, coupon_rate, freq, years, price = 1000.0, 5.0, 2.0, 2.0, 150.0
+    ytm = ytm_kernel(face, coupon_rate, freq, years, price, TOLERANCE, MAX_ITERATIONS)
+    assert ytm > 100  # above the bracket's 100% annual upper bound
+    coupon_payment = face * (coupon_rate / 100) / freq
+    assert reference_price(ytm / 100 / freq, coupon_payment, face, years * freq) == pytest.approx(price, abs=TOLERANCE)
+
+def test_zero_coupon_ytm():
+    ytm = ytm_kernel(1000.0, 0.0, 0.0, 2.5, 900.0, TOLERANCE, MAX_ITERATIONS)
+    assert ytm == pytest.approx(((1000.0 / 900.0) ** (1 / 2.5) - 1) * 100, rel=1e-12)
+
+@pytest.mark.parametrize("price, years", [(0.0, 5.0), (-10.0, 5.0), (950.0, 0.0), (950.0, -1.0)])
+def test_ytm_undefined(price, years):
+    assert np.isnan(ytm_kernel(1000.0, 5.0, 2.0, years, price, TOLERANCE, MAX_ITERATIONS))
+    assert FinancialCalculator.calculate_ytm(1000.0, 5.0, CouponFrequency.SEMI_ANNUAL, years, price) is None
+
+def test_ytm_batch_matches_scalar():
+    face = np.array([1000.0, 1000.0, 100.0, 1000.0, 1000.0])
+    coupon = np.array([5.0, 5.0, 7.25, 0.0, 5.0])
+    freq = np.array([2.0, 2.0, 12.0, 0.0, 2.0])
+    years = np.array([10.0, 3.7, 29.9, 2.5, 2.0])
+    price = np.array([950.0, 1020.0, 88.0, 900.0, 150.0])
+    batch = ytm_batch(face, coupon, freq, years, price, TOLERANCE, MAX_ITERATIONS)
+    scalar = [ytm_kernel(*bond, TOLERANCE, MAX_ITERATIONS) for bond in zip(face, coupon, freq, years, price)]
+    np.testing.assert_array_equal(batch, scalar)
+
+# Duration and convexity
+
+@pytest.mark.parametrize("face, coupon_rate, freq, years, ytm", [
+    (1000.0, 5.0, 2.0, 10.0, 5.6617),
+    (1000.0, 5.0, 2.0, 3.7, 4.4),        # fractional periods
+    (100.0, 7.25, 12.0, 29.9, 8.5),
+    (1000.0, 4.0, 1.0, 3.0, 0.0),        # zero yield
+    (1000.0, 4.0, 4.0, 30.0, 1e-6),      # Taylor branch of the annuity sums
+    (1000.0, 6.0, 1.0, 5.0, -1.8),
+])
+def test_duration_and_convexity_match_loop(face, coupon_rate, freq, years, ytm):
+    macaulay, modified, convexity = reference_risk(face, coupon_rate, freq, years, ytm)
+    assert duration_kernel(face, coupon_rate, freq, years, ytm) == pytest.approx((macaulay, modified), rel=1e-9)
+    assert convexity_kernel(face, coupon_rate, freq, years, ytm) == pytest.approx(convexity, rel=1e-9)
+
+def test_zero_coupon_duration_and_convexity():
+    years, ytm = 4.25, 3.5
+    one_plus = 1 + ytm / 100
+    assert duration_kernel(1000.0, 0.0, 0.0, years, ytm) == pytest.approx((years, years / one_plus))
+    assert convexity_kernel(1000.0, 0.0, 0.0, years, ytm) == pytest.approx(years * (years + 1) / one_plus ** 2)
+
+@pytest.mark.parametrize("face, coupon_rate, freq, years, price", [
+    (1000.0, 5.0, 2.0, 10.0, 950.0),
+    (1000.0, 5.0, 2.0, 3.7, 1020.0),
+    (1000.0, 0.0, 0.0, 2.5, 900.0),
+    (1000.0, 4.0, 1.0, 3.0, 1120.0),
+])
+def test_metrics_kernel_matches_separate_kernels(face, coupon_rate, freq, years, price):
+    ytm, macaulay, modified, convexity = metrics_kernel(face, coupon_rate, freq, years, price, TOLERANCE, MAX_ITERATIONS)
+    solved = ytm_kernel(face, coupon_rate, freq, years, price, TOLERANCE, MAX_ITERATIONS)
+    # Coupon-bond risk measures are taken at the reported (rounded) yield
+    expected_ytm = solved if freq == 0 else np.round(solved, 4)
+    assert ytm == expected_ytm
+    assert (macaulay, modified) == duration_kernel(face, coupon_rate, freq, years, ytm)
+    assert convexity == convexity_kernel(face, coupon_rate, freq, years, ytm)
+
+# Coupon schedules: anchored on the maturity day, clamped to short months
+
+def test_month_end_maturity_schedule():
+    dates = FinancialCalculator.generate_coupon_dates(
+        date(2021, 6, 15), date(2022, 1, 31), CouponFrequency.MONTHLY
+    )
+    assert dates == (
+        date(2021, 6, 30), date(2021, 7, 31), date(2021, 8, 31), date(2021, 9, 30),
+        date(2021, 10, 31), date(2021, 11, 30), date(2021, 12, 31), date(2022, 1, 31),
+    )
+
+def test_leap_day_maturity_schedule():
+    dates = FinancialCalculator.generate_coupon_dates(
+        date(2020, 3, 1), date(2024, 2, 29), CouponFrequency.ANNUAL
+    )
+    assert dates == (date(2021, 2, 28), date(2022, 2, 28), date(2023, 2, 28), date(2024, 2, 29))
+
+def test_semi_annual_schedule_through_february():
+    dates = FinancialCalculator.generate_coupon_dates(
+        date(2023, 9, 15), date(2025, 8, 31), CouponFrequency.SEMI_ANNUAL
+    )
+    assert dates == (date(2024, 2, 29), date(2024, 8, 31), date(2025, 2, 28), date(2025, 8, 31))
+
+def test_schedule_excludes_issue_date_and_slices_from_start():
+    issue, maturity = date(2020, 1, 31), date(2022, 1, 31)
+    dates = FinancialCalculator.generate_coupon_dates(issue, maturity, CouponFrequency.QUARTERLY)
+    assert dates[0] == date(2020, 4, 30)
+    assert dates[-1] == maturity
+    assert FinancialCalculator.generate_coupon_dates(
+        issue, maturity, CouponFrequency.QUARTERLY, start_from=date(2021, 7, 31)
+    ) == (date(2021, 7, 31), date(2021, 10, 31), date(2022, 1, 31))
+
+def test_zero_coupon_schedule():
+    maturity = date(2027, 1, 1)
+    assert FinancialCalculator.generate_coupon_dates(
+        date(2026, 1, 1), maturity, CouponFrequency.ZERO_COUPON
+    ) == (maturity,)
+
+def test_coupon_period_days():
+    days = FinancialCalculator.calculate_coupon_period_days(
+        date(2023, 12, 31), (date(2024, 2, 29), date(2024, 8, 31))
+    )
+    assert days.tolist() == [60, 184]
+
+# Day counts and accrued interest: batches against the scalar functions
+
+def random_date_pairs(count, seed):
+    rng = np.random.default_rng(seed)
+    starts = [date(2019, 1, 1) + timedelta(days=int(d)) for d in rng.integers(0, 2000, count)]
+    ends = [start + timedelta(days=int(d)) for start, d in zip(starts, rng.integers(0, 400, count))]
+    return starts, ends
+
+# Month ends, leap days and 30/360's day-31 caps
+EDGE_DATE_PAIRS = [
+    (date(2024, 1, 31), date(2024, 2, 29)), (date(2024, 2, 29), date(2024, 3, 31)),
+    (date(2023, 1, 30), date(2023, 3, 31)), (date(2023, 8, 31), date(2024, 2, 28)),
+    (date(2020, 6, 20), date(2020, 10, 11)), (date(2021, 12, 31), date(2021, 12, 31)),
+]
+
+@pytest.mark.parametrize("convention", list(DayCountConvention))
+def test_days_between_batch_matches_scalar(convention):
+    starts, ends = random_date_pairs(500, seed=1)
+    starts += [start for start, _ in EDGE_DATE_PAIRS]
+    ends += [end for _, end in EDGE_DATE_PAIRS]
+    days, basis = FinancialCalculator.calculate_days_between_batch(
+        np.array(starts, dtype="datetime64[D]"), np.array(ends, dtype="datetime64[D]"), convention
+    )
+    expected = [FinancialCalculator.calculate_days_between(start, end, convention) for start, end in zip(starts, ends)]
+    assert list(zip(days.tolist(), basis.tolist())) == expected
+
+def test_accrued_interest_batch_matches_scalar():
+    count = 2000
+    rng = np.random.default_rng(2)
+    starts, ends = random_date_pairs(count, seed=3)
+    face = rng.choice([100.0, 1000.0, 5000.0, 25000.0], count)
+    coupon = np.round(rng.uniform(0, 12, count), 2)
+    frequencies = [list(CouponFrequency)[i] for i in rng.integers(0, len(CouponFrequency), count)]
+    conventions = [list(DayCountConvention)[i] for i in rng.integers(0, len(DayCountConvention), count)]
+    # np.round and round disagree on the last digit here
+    face[0], coupon[0], frequencies[0], conventions[0] = 100.0, 7.83, CouponFrequency.ANNUAL, DayCountConvention.ACT_360
+    starts[0], ends[0] = date(2020, 6, 20), date(2020, 10, 11)
+
+    batch = FinancialCalculator.calculate_accrued_interest_batch(
+        face, coupon, frequencies,
+        np.array(starts, dtype="datetime64[D]"), np.array(ends, dtype="datetime64[D]"), conventions
+    )
+    expected = [
+        float(FinancialCalculator.calculate_accrued_interest(*args))
+        for args in zip(face, coupon, frequencies, starts, ends, conventions)
+    ]
+    assert batch.tolist() == expected
+    assert batch[0] == 2.4577
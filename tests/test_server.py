@@ -0,0 +1,119 @@
+"""HTTP behaviour of the API, against an in-memory SQLite database"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+
+import pytest
+
+from database import get_db
+from server import app, analytics_etag, etag_matches
+from tests.test_services import bond, sqlite_sessions
+
+httpx = pytest.importorskip("httpx")
+
+@asynccontextmanager
+async def api_client():
+    async with sqlite_sessions() as sessions:
+        async def override_get_db():
+            async with sessions() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                yield client
+        finally:
+            app.dependency_overrides.pop(get_db)
+
+async def seed(client):
+    """One holding in one portfolio; returns (portfolio_id, holding_id, security_id)"""
+    security = (await client.post("/api/securities", json=bond(4.5, date(2030, 1, 15)).model_dump(mode="json"))).json()
+    portfolio = (await client.post("/api/portfolios", json={"portfolio_name": "Core"})).json()
+    holding = (await client.post(f"/api/portfolios/{portfolio['id']}/holdings", json={
+        "security_id": security["id"], "purchase_date": "2021-03-01",
+        "purchase_price": "97.5", "quantity": "10"
+    })).json()
+    return portfolio["id"], holding["id"], security["id"]
+
+# ETag matching
+
+def test_etag_matches():
+    etag = analytics_etag("portfolio", 3)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag_matches(etag, etag)
+    assert etag_matches(f"W/{etag}", etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(analytics_etag("portfolio", 4), etag)
+    assert not etag_matches(analytics_etag("portfolio", 3, "2025-01-01"), etag)
+
+# Conditional analytics GETs
+
+ANALYTICS_PATHS = [
+    "/api/portfolios/{portfolio_id}/analytics",
+    "/api/portfolios/{portfolio_id}/valuation",
+    "/api/holdings/{holding_id}/yields",
+]
+
+@pytest.mark.parametrize("path", ANALYTICS_PATHS)
+def test_analytics_not_modified(path):
+    async def scenario():
+        async with api_client() as client:
+            portfolio_id, holding_id, _ = await seed(client)
+            url = path.format(portfolio_id=portfolio_id, holding_id=holding_id)
+
+            first = await client.get(url)
+            assert first.status_code == 200
+            etag = first.headers["ETag"]
+
+            for if_none_match in (etag, f"W/{etag}", f'"stale", {etag}', "*"):
+                response = await client.get(url, headers={"If-None-Match": if_none_match})
+                assert response.status_code == 304
+                assert response.headers["ETag"] == etag
+                assert response.content == b""
+
+            assert (await client.get(url, headers={"If-None-Match": '"stale"'})).status_code == 200
+
+    asyncio.run(scenario())
+
+async def update_holding(client, holding_id, security_id):
+    return await client.put(f"/api/holdings/{holding_id}", json={"quantity": "40"})
+
+async def update_security(client, holding_id, security_id):
+    return await client.put(f"/api/securities/{security_id}", json={"coupon_rate": 6.0})
+
+async def delete_holding(client, holding_id, security_id):
+    return await client.delete(f"/api/holdings/{holding_id}")
+
+@pytest.mark.parametrize("path", ANALYTICS_PATHS)
+@pytest.mark.parametrize("write", [update_holding, update_security, delete_holding])
+def test_analytics_etag_changes_after_write(path, write):
+    async def scenario():
+        async with api_client() as client:
+            portfolio_id, holding_id, security_id = await seed(client)
+            url = path.format(portfolio_id=portfolio_id, holding_id=holding_id)
+            etag = (await client.get(url)).headers["ETag"]
+
+            # Writes in the same second as the GET still produce a new tag
+            assert (await write(client, holding_id, security_id)).is_success
+            response = await client.get(url, headers={"If-None-Match": etag})
+            assert response.status_code == 200
+            assert response.headers["ETag"] != etag
+
+    asyncio.run(scenario())
+
+def test_analytics_etag_unchanged_by_unrelated_write():
+    async def scenario():
+        async with api_client() as client:
+            portfolio_id, _, _ = await seed(client)
+            _, other_holding_id, _ = await seed(client)
+            url = f"/api/portfolios/{portfolio_id}/analytics"
+            etag = (await client.get(url)).headers["ETag"]
+
+            await client.put(f"/api/holdings/{other_holding_id}", json={"quantity": "40"})
+            assert (await client.get(url, headers={"If-None-Match": etag})).status_code == 304
+
+    asyncio.run(scenario())
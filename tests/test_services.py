@@ -0,0 +1,159 @@
+"""Service-layer queries and caching"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from database import Base
+from models import Portfolio, PortfolioAnalyticsCache
+from schemas import HoldingCreate, HoldingUpdate, PortfolioCreate, SecurityCreate, SecurityUpdate
+from services import AnalyticsService, HoldingService, PortfolioService, SecurityService
+
+def compile_issuer_filter(url, issuer):
+    session = AsyncSession(bind=create_async_engine(url))
+    clause = SecurityService._issuer_filter(session, issuer)
+    # The MySQL dialect uses pyformat parameters, so literal % signs come out doubled
+    return str(clause.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+
+# Issuer search
+
+@pytest.mark.parametrize("issuer, terms", [
+    ("Apple", "+Apple*"),
+    ("Apple Inc.", "+Apple* +Inc*"),
+    ("Coca-Cola", "+Coca* +Cola*"),
+])
+def test_issuer_filter_uses_fulltext_prefix_terms(issuer, terms):
+    sql = compile_issuer_filter("mysql+aiomysql://user:pw@localhost/db", issuer)
+    assert sql == f"MATCH (fixed_income_securities.issuer) AGAINST ('{terms}' IN BOOLEAN MODE)"
+
+@pytest.mark.parametrize("issuer", [
+    "JP Morgan",          # shorter than the FULLTEXT minimum token size
+    "Bank of America",
+    "The Coca-Cola Co",
+    "Apple For Life",     # stopwords are never indexed
+    "Made With Care",
+    "--",                 # no words at all
+])
+def test_issuer_filter_falls_back_to_like(issuer):
+    sql = compile_issuer_filter("mysql+aiomysql://user:pw@localhost/db", issuer)
+    assert sql == f"fixed_income_securities.issuer LIKE '%%{issuer}%%'"
+
+def test_issuer_filter_uses_like_off_mysql():
+    pytest.importorskip("aiosqlite")
+    sql = compile_issuer_filter("sqlite+aiosqlite://", "Apple")
+    assert sql == "fixed_income_securities.issuer LIKE '%%Apple%%'"
+
+# Analytics cache, on an in-memory SQLite database
+
+@asynccontextmanager
+async def sqlite_sessions():
+    pytest.importorskip("aiosqlite")
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+
+def bond(coupon_rate, maturity_date):
+    return SecurityCreate(
+        security_name=f"{coupon_rate}% {maturity_date.year}", security_type="CORPORATE_BOND",
+        face_value=Decimal("1000"), coupon_rate=coupon_rate, coupon_frequency="SEMI_ANNUAL",
+        issue_date=date(2020, 1, 15), maturity_date=maturity_date, issuer="Example Corp"
+    )
+
+async def seed_portfolio(db):
+    """A portfolio of two holdings in different bonds; returns (portfolio, holdings, securities)"""
+    securities = [
+        await SecurityService.create_security(db, bond(4.5, date(2030, 1, 15))),
+        await SecurityService.create_security(db, bond(7.0, date(2045, 1, 15))),
+    ]
+    portfolio = await PortfolioService.create_portfolio(db, PortfolioCreate(portfolio_name="Core"))
+    holdings = [
+        await HoldingService.create_holding(db, portfolio.id, HoldingCreate(
+            security_id=security.id, purchase_date=date(2021, 3, 1),
+            purchase_price=Decimal(price), quantity=Decimal("10")
+        ))
+        for security, price in zip(securities, ("97.5", "104.25"))
+    ]
+    return portfolio, holdings, securities
+
+async def cache_row(db, portfolio_id):
+    return await db.get(PortfolioAnalyticsCache, portfolio_id, populate_existing=True)
+
+def test_analytics_cached_for_same_version_and_day():
+    async def scenario():
+        async with sqlite_sessions() as sessions, sessions() as db:
+            portfolio, _, _ = await seed_portfolio(db)
+            first = await AnalyticsService.calculate_portfolio_analytics(db, portfolio.id)
+            row = await cache_row(db, portfolio.id)
+            assert row.analytics_version == await AnalyticsService.get_analytics_version(db, portfolio_id=portfolio.id)
+            
+            # Overwrite the stored figures: a cache hit returns them rather than recomputing
+            await db.execute(update(PortfolioAnalyticsCache).values(weighted_average_yield=-1.0))
+            await db.commit()
+            hit = await AnalyticsService.calculate_portfolio_analytics(db, portfolio.id)
+            assert hit.weighted_average_yield == -1.0
+            assert hit.portfolio_duration == first.portfolio_duration
+            
+            # Results from an earlier day are recomputed
+            await db.execute(update(PortfolioAnalyticsCache).values(computed_at=datetime.now() - timedelta(days=1)))
+            await db.commit()
+            assert await AnalyticsService.calculate_portfolio_analytics(db, portfolio.id) == first
+    
+    asyncio.run(scenario())
+
+async def add_holding(db, portfolio, holdings, securities):
+    await HoldingService.create_holding(db, portfolio.id, HoldingCreate(
+        security_id=securities[1].id, purchase_date=date(2022, 6, 1),
+        purchase_price=Decimal("88"), quantity=Decimal("25")
+    ))
+
+async def update_holding(db, portfolio, holdings, securities):
+    await HoldingService.update_holding(db, holdings[0].id, HoldingUpdate(quantity=Decimal("40")))
+
+async def delete_holding(db, portfolio, holdings, securities):
+    await HoldingService.delete_holding(db, holdings[1].id)
+
+async def update_security(db, portfolio, holdings, securities):
+    await SecurityService.update_security(db, securities[1].id, SecurityUpdate(coupon_rate=2.5))
+
+@pytest.mark.parametrize("write", [add_holding, update_holding, delete_holding, update_security])
+def test_analytics_recomputed_after_write(write):
+    async def scenario():
+        async with sqlite_sessions() as sessions, sessions() as db:
+            portfolio, holdings, securities = await seed_portfolio(db)
+            before = await AnalyticsService.calculate_portfolio_analytics(db, portfolio.id)
+            version = (await cache_row(db, portfolio.id)).analytics_version
+            
+            await write(db, portfolio, holdings, securities)
+            assert await cache_row(db, portfolio.id) is None
+            assert await AnalyticsService.get_analytics_version(db, portfolio_id=portfolio.id) == version + 1
+            
+            after = await AnalyticsService.calculate_portfolio_analytics(db, portfolio.id)
+            assert after != before
+            assert (await cache_row(db, portfolio.id)).analytics_version == version + 1
+    
+    asyncio.run(scenario())
+
+def test_analytics_computed_before_a_write_are_not_served():
+    async def scenario():
+        async with sqlite_sessions() as sessions, sessions() as db:
+            portfolio, holdings, _ = await seed_portfolio(db)
+            version = await AnalyticsService.get_analytics_version(db, portfolio_id=portfolio.id)
+            stale = await AnalyticsService.calculate_portfolio_analytics(db, portfolio.id)
+            
+            # A result computed from pre-write holdings lands after the write committed
+            await HoldingService.update_holding(db, holdings[0].id, HoldingUpdate(quantity=Decimal("40")))
+            await AnalyticsService._store_analytics(db, stale, version)
+            assert (await cache_row(db, portfolio.id)).analytics_version == version
+            
+            assert await AnalyticsService.calculate_portfolio_analytics(db, portfolio.id) != stale
+    
+    asyncio.run(scenario())